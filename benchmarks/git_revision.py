@@ -0,0 +1,44 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+
+Load an earlier revision of a module from git, so benchmarks can compare against it.
+"""
+
+import importlib.util
+import subprocess
+import sys
+import tempfile
+
+
+def load_module_at_revision(path, revision):
+    """
+    Import the version of a module file at a git revision under a separate name.
+
+    :param path: The path of the module file relative to the repository root.
+    :param revision: The git revision, e.g. 'c15f68e' or 'HEAD~3'.
+    :return: The imported module.
+    """
+    source = subprocess.run(['git', 'show', f"{revision}:{path}"], check=True, capture_output=True).stdout
+    with tempfile.NamedTemporaryFile('wb', suffix='.py', delete=False) as file:
+        file.write(source)
+    module_name = f"{path.replace('/', '_')[:-3]}_{revision.replace('~', '_')}"
+    spec = importlib.util.spec_from_file_location(module_name, file.name)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
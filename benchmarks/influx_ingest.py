@@ -0,0 +1,151 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+
+Time the per-sample ingest cost of Influx locator counters: every series of a query response is fed through
+telemetry.process_influx_locator, which parses the time stamp and updates the monitor and router rates.
+The response is ingested with RFC 3339 time stamps and with epoch seconds (INFLUX_EPOCH = 's', the
+default), and with RFC 3339 time stamps by telemetry at the baseline revision, which parsed them with
+dateutil. Each cycle replays the response 30 s later with higher counters.
+
+The response is generated for the lab topology in jsonfiles, or read from a recorded query response of
+either time stamp format, e.g. saved with:
+
+    curl -G http://<influx>:8086/query --data-urlencode db=telegraf --data-urlencode epoch=s \
+        --data-urlencode q="$(sed 's/{hostnames}/.*/' templates/query_batch_template.txt)" > response.json
+
+Run from the repository root:
+
+    python -m benchmarks.influx_ingest
+    python -m benchmarks.influx_ingest --response response.json --revision c15f68e
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from datetime import datetime, timezone
+import dateutil.parser
+from benchmarks.git_revision import load_module_at_revision
+from python import influx
+from python import telemetry
+
+CYCLES = 300
+CYCLE_SECONDS = 30
+BASELINE_REVISION = 'c15f68e'
+
+
+def generate_series(rng):
+    # One series per router interface and locator, with nanosecond RFC 3339 time stamps like Influx returns
+    series = []
+    for router_id, attributes in telemetry.file_dict.items():
+        for neighbor in attributes['neighbors']:
+            for locator_addr in telemetry.sid_map:
+                series.append({
+                    'name': telemetry.LOCATOR_ENCODING_PATH,
+                    'tags': {'source': router_id, 'accounting_information/outgoing_interface': neighbor['intf_name'],
+                             'ipv6_address': locator_addr},
+                    'columns': ['time', telemetry.LOCATOR_BYTES_FIELD],
+                    'values': [[f"2025-03-14T10:00:{rng.randrange(30):02d}.{rng.randrange(10 ** 9):09d}Z",
+                                rng.randrange(10 ** 12)]]
+                })
+    return series
+
+
+def read_series(path):
+    # A recorded response is either one json document or chunked, one json document per line
+    with open(path, 'r') as file:
+        text = file.read()
+    try:
+        responses = [json.loads(text)]
+    except ValueError:
+        responses = [json.loads(line) for line in text.splitlines() if line.strip()]
+    series = []
+    for response in responses:
+        series.extend(telemetry.get_influx_series(response))
+    return [data for data in series if data.get('tags', {}).get('source') in telemetry.router_dict]
+
+
+def split_time(influx_time):
+    # Epoch seconds and the fractional digits of a recorded time stamp of either format
+    if isinstance(influx_time, str):
+        fraction = influx_time[19:].rstrip('Z') if influx_time.endswith('Z') else ''
+        return influx.rfc3339_to_epoch(influx_time), fraction
+    return int(influx_time), ''
+
+
+def build_cycles(series, time_format):
+    # The series of every cycle, time_format is 'rfc3339' or 'epoch'
+    base = [(data, *split_time(data['values'][0][0])) for data in series]
+    cycles = []
+    for cycle in range(CYCLES):
+        cycle_series = []
+        for data, epoch, fraction in base:
+            epoch += cycle * CYCLE_SECONDS
+            if time_format == 'rfc3339':
+                influx_time = datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + fraction + 'Z'
+            else:
+                influx_time = epoch
+            byte_count = int(data['values'][0][1]) + cycle * 10 ** 9
+            cycle_series.append(dict(data, values=[[influx_time, byte_count]]))
+        cycles.append(cycle_series)
+    return cycles
+
+
+def reset(module):
+    # Start from an empty monitor and routers without rates
+    module.monitor = module.router_interface_monitor.RouterInterfaceMonitor()
+    module.router_dict = {router_id: module.router.Router(router_id) for router_id in module.router_dict}
+
+
+def measure(module, cycles):
+    reset(module)
+    influx.epoch_cache.clear()
+    start = time.perf_counter()
+    for cycle_series in cycles:
+        for data in cycle_series:
+            module.process_influx_locator(data)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Influx locator counter ingest benchmark.")
+    parser.add_argument("--response", help="A recorded Influx query response, generated if not given.")
+    parser.add_argument("--revision", default=BASELINE_REVISION,
+                        help=f"The baseline revision of telemetry, {BASELINE_REVISION} by default.")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    series = read_series(args.response) if args.response else generate_series(random.Random(0))
+    rfc3339_cycles = build_cycles(series, 'rfc3339')
+    epoch_cycles = build_cycles(series, 'epoch')
+    # The fast parse must agree with the dateutil parse it replaced
+    for data in rfc3339_cycles[0][:1000]:
+        rfc3339_string = data['values'][0][0]
+        assert influx.rfc3339_to_epoch(rfc3339_string) == \
+            int(dateutil.parser.isoparse(rfc3339_string).timestamp()), rfc3339_string
+    baseline = load_module_at_revision('python/telemetry.py', args.revision)
+    samples = len(series) * CYCLES
+    for name, module, cycles in ((f"{args.revision} rfc3339", baseline, rfc3339_cycles),
+                                 ('rfc3339', telemetry, rfc3339_cycles), ('epoch=s', telemetry, epoch_cycles)):
+        ingest_time = measure(module, cycles)
+        print(f"{name:>16}: {ingest_time:5.2f} s per {samples} samples, "
+              f"{ingest_time / samples * 10 ** 6:5.2f} us per sample")
+
+
+if __name__ == '__main__':
+    main()
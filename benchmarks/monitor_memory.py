@@ -0,0 +1,82 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+
+Measure the memory held by RouterInterfaceMonitor for 100 routers x 20 interfaces x 100 locators
+(200k series) after a few samples per series, and the time of a full garbage collection.
+
+Run from the repository root, optionally against earlier revisions of the monitor:
+
+    python -m benchmarks.monitor_memory
+    python -m benchmarks.monitor_memory --revision c15f68e
+"""
+
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+from benchmarks.git_revision import load_module_at_revision
+from python import router_interface_monitor
+
+ROUTERS = 100
+INTERFACES = 20
+LOCATORS = 100
+SAMPLES = 5
+
+
+def measure(module):
+    routers = [f"router-{index}" for index in range(ROUTERS)]
+    interfaces = [f"HundredGigE0/0/0/{index}" for index in range(INTERFACES)]
+    locator_addrs = [f"fcff:10:{index:x}::" for index in range(LOCATORS)]
+    gc.collect()
+    tracemalloc.start()
+    monitor = module.RouterInterfaceMonitor()
+    for sample in range(SAMPLES):
+        for router_id in routers:
+            for interface_id in interfaces:
+                for locator_addr in locator_addrs:
+                    monitor.update_data(router_id, interface_id, locator_addr, 10 ** 12 + sample * 10 ** 9,
+                                        1000 + sample * 30)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    gc.collect()
+    gc_time = time.perf_counter() - start
+    # Keep the monitor alive until the collection has been timed
+    del monitor
+    return memory, gc_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RouterInterfaceMonitor memory benchmark.")
+    parser.add_argument("--revision", action='append', default=[],
+                        help="Also measure the monitor at this git revision, can be repeated.")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    modules = [(revision, load_module_at_revision('python/router_interface_monitor.py', revision))
+               for revision in args.revision]
+    modules.append(('working tree', router_interface_monitor))
+    series = ROUTERS * INTERFACES * LOCATORS
+    for name, module in modules:
+        memory, gc_time = measure(module)
+        print(f"{name:>14}: {memory / 2 ** 20:6.1f} MiB for {series} series, "
+              f"{memory / series:5.0f} bytes per series, gc.collect {gc_time * 1000:4.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+
+Time 1M RouterInterfaceMonitor.update_data calls: 100 samples for each of 10k series.
+
+Run from the repository root, optionally against earlier revisions of the monitor:
+
+    python -m benchmarks.monitor_update
+    python -m benchmarks.monitor_update --revision c15f68e --revision 34c05be
+"""
+
+import argparse
+import logging
+import time
+from benchmarks.git_revision import load_module_at_revision
+from python import router_interface_monitor
+
+SERIES = 10000
+SAMPLES = 100
+
+
+def measure(module):
+    monitor = module.RouterInterfaceMonitor()
+    keys = [(f"router-{index % 100}", f"HundredGigE0/0/0/{index % 7}", f"fcff:10:{index:x}::")
+            for index in range(SERIES)]
+    start = time.perf_counter()
+    for sample in range(SAMPLES):
+        for router_id, interface_id, locator_addr in keys:
+            monitor.update_data(router_id, interface_id, locator_addr, sample * 10 ** 9, sample * 30)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RouterInterfaceMonitor update benchmark.")
+    parser.add_argument("--revision", action='append', default=[],
+                        help="Also measure the monitor at this git revision, can be repeated.")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    modules = [(revision, load_module_at_revision('python/router_interface_monitor.py', revision))
+               for revision in args.revision]
+    modules.append(('working tree', router_interface_monitor))
+    for name, module in modules:
+        update_time = measure(module)
+        print(f"{name:>14}: {update_time:5.2f} s per {SERIES * SAMPLES} updates, "
+              f"{update_time / (SERIES * SAMPLES) * 10 ** 6:4.2f} us per update")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+
+Compare the traffic matrix engines on random topologies of 100, 500 and 2000 nodes. The full, incremental
+and vectorized computations must produce the same entries, the timings of each are printed.
+
+Run from the repository root:
+
+    python -m benchmarks.traffic_matrix_engine
+"""
+
+import logging
+import random
+import time
+from python import router
+from python import traffic_matrix
+from python import traffic_matrix_engine
+
+NODE_COUNTS = (100, 500, 2000)
+NEIGHBORS_PER_NODE = 4
+LOCATORS_PER_LINK = 8
+RATES = (0, 3000, 8000, 20000, 60000)
+THRESHOLD = 5000
+
+
+def build_traffic_entry(router_id, locator_addr, external_traffic):
+    return {
+        'source_router': router_id,
+        'dest_router': locator_addr,
+        'locator_addr': locator_addr,
+        'traffic_rate': external_traffic,
+        'algo_name': 'ALGO',
+        'demand_name': f"{router_id}_{locator_addr}"
+    }
+
+
+def build_topology(node_count, seed=0):
+    # Random links between routers, each carrying traffic to a random set of locators in both directions
+    rng = random.Random(seed)
+    router_dict = {f"r{index}": router.Router(f"r{index}") for index in range(node_count)}
+    links = []
+    for index in range(node_count):
+        for other in rng.sample(range(node_count), NEIGHBORS_PER_NODE // 2):
+            if other != index:
+                links.append((f"r{index}", f"r{other}"))
+    for link_id, (router_a, router_b) in enumerate(links):
+        router_dict[router_a].add_neighbor(router_b, f"if{link_id}b")
+        router_dict[router_b].add_neighbor(router_a, f"if{link_id}a")
+    locator_addrs = [f"fcff:10:{index:x}::" for index in range(node_count)]
+    for link_id, (router_a, router_b) in enumerate(links):
+        for locator_addr in rng.sample(locator_addrs, LOCATORS_PER_LINK):
+            router_dict[router_a].add_intf_locator(f"if{link_id}a", locator_addr, rng.choice(RATES), 1)
+            router_dict[router_b].add_intf_locator(f"if{link_id}b", locator_addr, rng.choice(RATES), 1)
+    return router_dict, locator_addrs
+
+
+def compute_full(router_dict, locator_addrs):
+    # The locator by locator computation of telemetry.update_traffic_matrix
+    local_traffic_matrix = traffic_matrix.TrafficMatrix()
+    for locator_addr in locator_addrs:
+        for router_id in router_dict.keys():
+            external_traffic = traffic_matrix_engine.get_external_traffic(router_dict, router_id, locator_addr)
+            if external_traffic >= THRESHOLD:
+                local_traffic_matrix.add_traffic_entry(**build_traffic_entry(router_id, locator_addr,
+                                                                             external_traffic))
+    return local_traffic_matrix
+
+
+def sorted_entries(local_traffic_matrix):
+    return sorted(local_traffic_matrix.get_traffic_entries(),
+                  key=lambda entry: (entry['source_router'], entry['locator_addr']))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    logging.disable(logging.INFO)
+    print(f"{'nodes':>6} {'entries':>8} {'full':>9} {'incremental':>12} {'vectorized':>11} {'speedup':>8}")
+    for node_count in NODE_COUNTS:
+        router_dict, locator_addrs = build_topology(node_count)
+        full, full_time = timed(compute_full, router_dict, locator_addrs)
+
+        vectorized_engine = traffic_matrix_engine.VectorizedTrafficMatrixEngine(router_dict, build_traffic_entry,
+                                                                                THRESHOLD)
+        vectorized, vectorized_time = timed(vectorized_engine.compute, locator_addrs)
+        # The vectorized engine emits the entries in the same order as the full computation
+        assert vectorized.get_traffic_entries() == full.get_traffic_entries(), "vectorized differs from full"
+
+        incremental_engine = traffic_matrix_engine.IncrementalTrafficMatrixEngine(router_dict, build_traffic_entry,
+                                                                                  THRESHOLD)
+        _, incremental_time = timed(incremental_engine.compute)
+        assert sorted_entries(incremental_engine.traffic_matrix) == sorted_entries(full), \
+            "incremental differs from full"
+
+        print(f"{node_count:>6} {len(full.get_traffic_entries()):>8} {full_time:>8.3f}s {incremental_time:>11.3f}s "
+              f"{vectorized_time:>10.3f}s {full_time / vectorized_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -47,10 +47,17 @@ jQuery.fn.extend({
 // Web client javascript functions (including websocket client code)...
 var client = {
     queue: {},
+    port: null,
+
+    // Rows received through the snapshot+delta protocol, the version of the last applied message and the
+    // table row element of each row
+    traffic: {rows: new Map(), version: null, elements: new Map()},
+    interfaces: {rows: new Map(), version: null, elements: new Map(), tables: new Map()},
 
     // Connects to Python through the websocket
     connect: function (port) {
         var self = this;
+        this.port = port;
         console.log("Opening websocket to ws://" + window.location.hostname + ":" + port + "/websocket");
         this.socket = new WebSocket("ws://" + window.location.hostname + ":" + port + "/websocket");
 
@@ -59,14 +66,20 @@ var client = {
         };
 
         this.socket.onmessage = function (messageEvent) {
-            console.log("Got a message...");
             var data_json = JSON.parse($().cleanJSON(messageEvent.data));
             if (data_json.target === 'interface') {
-                client.buildInterfaceTable(data_json.data);
+                client.handleInterfaceMessage(data_json);
             } else if (data_json.target === 'traffic') {
-                client.buildTrafficMatrixTable(data_json.data);
+                client.handleTrafficMessage(data_json);
             }
-            console.log(messageEvent.data);
+        };
+
+        // The server sends a new snapshot on every connection, so reconnecting recovers from any gap
+        this.socket.onclose = function () {
+            console.log("Websocket closed, reconnecting...");
+            setTimeout(function () {
+                client.connect(client.port);
+            }, 1000);
         };
         return this.socket;
     },
@@ -91,11 +104,64 @@ var client = {
         this.socket.send(JSON.stringify({method: "process_ws_message", params: {message: message}}));
     },
 
+    // Applies a snapshot or delta message to the rows of a target, returns false if it was not applied
+    applyRows: function (state, message, rowKey, removedRowKey) {
+        if (message.type === 'snapshot') {
+            state.rows = new Map(message.rows.map(row => [rowKey(row), row]));
+            state.version = message.version;
+            return true;
+        }
+        if (state.version === null || message.version <= state.version) {
+            // Delta already included in the snapshot
+            return false;
+        }
+        if (message.base !== state.version) {
+            console.log(`Missed ${message.target} updates, reconnecting for a new snapshot...`);
+            this.socket.close();
+            return false;
+        }
+        message.upsert.forEach(row => state.rows.set(rowKey(row), row));
+        message.remove.forEach(key => state.rows.delete(removedRowKey(key)));
+        state.version = message.version;
+        return true;
+    },
+
+    setUpdateTime: function () {
+        const updateTimeElement = document.getElementById("update-time");
+        const now = new Date();
+        updateTimeElement.textContent = `Last updated: ${now.toLocaleString()}`;
+    },
+
+    handleTrafficMessage: function (message) {
+        if (!document.querySelector("#traffic-table tbody")) {
+            return;
+        }
+        if (!this.applyRows(this.traffic, message, row => row.demand_name, key => key)) {
+            return;
+        }
+        if (message.type === 'snapshot') {
+            this.buildTrafficMatrixTable(Array.from(this.traffic.rows.values()));
+        } else {
+            this.updateTrafficMatrixRows(message.upsert, message.remove);
+        }
+    },
+
+    createTrafficRow: function (row) {
+        const tr = document.createElement("tr");
+        tr.innerHTML = `<td>${row.source_router}</td>
+                        <td>${row.dest_router}</td>
+                        <td>${row.algo_name}</td>
+                        <td class="traffic-cell">${row.traffic_rate}</td>`;
+        tr.dataset.source = row.source_router;
+        this.traffic.elements.set(row.demand_name, tr);
+        return tr;
+    },
+
     buildTrafficMatrixTable: function (traffic_data) {
         const tbody = document.querySelector("#traffic-table tbody");
-        const prevTrafficRates = new Map(); // Store previous traffic rates
 
         tbody.innerHTML = ""; // Clear existing rows
+        this.traffic.elements.clear();
 
         // Sort the data by the first column (source_router)
         traffic_data.sort((a, b) => {
@@ -105,89 +171,162 @@ var client = {
         });
 
         traffic_data.forEach(row => {
-            const tr = document.createElement("tr");
-            const lastCellValue = row.traffic_rate; // Last cell in the row
-
-            tr.innerHTML = `<td>${row.source_router}</td>
-                        <td>${row.dest_router}</td>
-                        <td>${row.algo_name}</td>
-                        <td class="traffic-cell">${lastCellValue}</td>`;
+            tbody.appendChild(this.createTrafficRow(row));
+        });
 
-            // Append row first to ensure DOM is updated
-            tbody.appendChild(tr);
+        this.setUpdateTime();
+    },
 
-            const lastCell = tr.querySelector(".traffic-cell");
-            const key = `${row.source_router}-${row.dest_router}`; // Unique key for tracking
+    updateTrafficMatrixRows: function (upsert, remove) {
+        const tbody = document.querySelector("#traffic-table tbody");
 
-            if (prevTrafficRates.has(key) && prevTrafficRates.get(key) !== lastCellValue) {
-                // Value changed, highlight the cell
-                lastCell.style.backgroundColor = "lightgreen";
-                setTimeout(() => {
-                    lastCell.style.backgroundColor = ""; // Reset after 1 second
-                }, 2000);
+        remove.forEach(key => {
+            const tr = this.traffic.elements.get(key);
+            if (tr) {
+                tr.remove();
+                this.traffic.elements.delete(key);
             }
+        });
 
-            // Update stored value for next comparison
-            prevTrafficRates.set(key, lastCellValue);
+        upsert.forEach(row => {
+            const tr = this.traffic.elements.get(row.demand_name);
+            if (tr) {
+                const lastCell = tr.querySelector(".traffic-cell");
+                if (lastCell.textContent !== String(row.traffic_rate)) {
+                    lastCell.textContent = row.traffic_rate;
+                    // Value changed, highlight the cell
+                    lastCell.style.backgroundColor = "lightgreen";
+                    setTimeout(() => {
+                        lastCell.style.backgroundColor = ""; // Reset after 2 seconds
+                    }, 2000);
+                }
+                return;
+            }
+            // Keep the rows sorted by source_router
+            const newRow = this.createTrafficRow(row);
+            const nextRow = Array.from(tbody.children).find(other => other.dataset.source > row.source_router);
+            tbody.insertBefore(newRow, nextRow || null);
         });
 
-        // Update the timestamp
-        const updateTimeElement = document.getElementById("update-time");
-        const now = new Date();
-        updateTimeElement.textContent = `Last updated: ${now.toLocaleString()}`;
+        this.setUpdateTime();
+    },
+
+    handleInterfaceMessage: function (message) {
+        if (!document.querySelector("#tables-container")) {
+            return;
+        }
+        if (!this.applyRows(this.interfaces, message, row => `${row.router}|${row.interface}`,
+            key => `${key[0]}|${key[1]}`)) {
+            return;
+        }
+        if (message.type === 'snapshot') {
+            const interface_data = {};
+            this.interfaces.rows.forEach(row => {
+                interface_data[row.router] = interface_data[row.router] || {};
+                interface_data[row.router][row.interface] = row;
+            });
+            this.buildInterfaceTable(interface_data);
+        } else {
+            this.updateInterfaceRows(message.upsert, message.remove);
+        }
+    },
+
+    createRouterTable: function (router) {
+        const container = document.querySelector("#tables-container");
+        const table = document.createElement("table");
+        table.innerHTML = `
+            <thead>
+                <tr>
+                    <th colspan="4">Router: ${router}</th>
+                </tr>
+                <tr>
+                    <th>Interface</th>
+                    <th>Neighbor</th>
+                    <th>Capacity</th>
+                    <th>Traffic</th>
+                    <th>Utilization</th>
+                    <th>Worst Case Traffic</th>
+                    <th>Worst Case Utilization</th>
+                    <th>Failure Scenario</th>
+                </tr>
+            </thead>
+            <tbody>
+            </tbody>
+        `;
+        container.appendChild(table);
+        container.appendChild(document.createElement("br"));
+        const tableBody = table.querySelector("tbody");
+        this.interfaces.tables.set(router, tableBody);
+        return tableBody;
+    },
+
+    setInterfaceRowCells: function (tr, interface, entry) {
+        tr.innerHTML = `<td>${interface}</td>
+                        <td>${entry["neighbor"]}</td>
+                        <td>${entry["capacity"]}</td>
+                        <td>${entry["traffic"]}</td>
+                        <td>${entry["util"]}%</td>
+                        <td>${entry["worst-case-traffic"]}</td>
+                        <td style="color: ${entry["worst-case-util"] > 70 ? 'red' : 'black'}; font-weight: ${entry["worst-case-util"] > 70 ? 'bold' : 'normal'}">${entry["worst-case-util"]}%</td>
+                        <td>${entry["failure-scenario"]}</td>`;
+        tr.dataset.wcUtil = entry["worst-case-util"];
     },
 
     buildInterfaceTable: function (interface_data) {
         const container = document.querySelector("#tables-container");
         container.innerHTML = "";
+        this.interfaces.elements.clear();
+        this.interfaces.tables.clear();
 
         for (const router in interface_data) {
             if (interface_data.hasOwnProperty(router)) {
-                const table = document.createElement("table");
-                table.innerHTML = `
-                    <thead>
-                        <tr>
-                            <th colspan="4">Router: ${router}</th>
-                        </tr>
-                        <tr>
-                            <th>Interface</th>
-                            <th>Neighbor</th>
-                            <th>Capacity</th>
-                            <th>Traffic</th>
-                            <th>Utilization</th>
-                            <th>Worst Case Traffic</th>
-                            <th>Worst Case Utilization</th>
-                            <th>Failure Scenario</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                    </tbody>
-                `;
-                const tableBody = table.querySelector("tbody");
+                const tableBody = this.createRouterTable(router);
 
                 let sortedEntries = Object.entries(interface_data[router]).sort((a, b) => b[1]["worst-case-util"] - a[1]["worst-case-util"]);
 
                 for (const [interface, entry] of sortedEntries) {
-                    const row = `<tr>
-                        <td>${interface}</td>
-                        <td>${entry["neighbor"]}</td>
-                        <td>${entry["capacity"]}</td>
-                        <td>${entry["traffic"]}</td>
-                        <td>${entry["util"]}%</td>
-                        <td>${entry["worst-case-traffic"]}</td>
-                        <td style="color: ${entry["worst-case-util"] > 70 ? 'red' : 'black'}; font-weight: ${entry["worst-case-util"] > 70 ? 'bold' : 'normal'}">${entry["worst-case-util"]}%</td>
-                        <td>${entry["failure-scenario"]}</td>
-                    </tr>`;
-                    tableBody.innerHTML += row;
+                    const tr = document.createElement("tr");
+                    this.setInterfaceRowCells(tr, interface, entry);
+                    tableBody.appendChild(tr);
+                    this.interfaces.elements.set(`${router}|${interface}`, tr);
                 }
-                container.appendChild(table);
-                container.appendChild(document.createElement("br"));
             }
         }
-        // Update the timestamp
-        const updateTimeElement = document.getElementById("update-time");
-        const now = new Date();
-        updateTimeElement.textContent = `Last updated: ${now.toLocaleString()}`;
+        this.setUpdateTime();
     },
-};
 
+    updateInterfaceRows: function (upsert, remove) {
+        const changedTables = new Set();
+
+        remove.forEach(key => {
+            const rowKey = `${key[0]}|${key[1]}`;
+            const tr = this.interfaces.elements.get(rowKey);
+            if (tr) {
+                tr.remove();
+                this.interfaces.elements.delete(rowKey);
+            }
+        });
+
+        upsert.forEach(row => {
+            const rowKey = `${row.router}|${row.interface}`;
+            let tr = this.interfaces.elements.get(rowKey);
+            if (!tr) {
+                const tableBody = this.interfaces.tables.get(row.router) || this.createRouterTable(row.router);
+                tr = document.createElement("tr");
+                tableBody.appendChild(tr);
+                this.interfaces.elements.set(rowKey, tr);
+            }
+            this.setInterfaceRowCells(tr, row.interface, row);
+            changedTables.add(this.interfaces.tables.get(row.router));
+        });
+
+        // Keep the changed tables sorted by worst case utilization
+        changedTables.forEach(tableBody => {
+            Array.from(tableBody.children)
+                .sort((a, b) => b.dataset.wcUtil - a.dataset.wcUtil)
+                .forEach(tr => tableBody.appendChild(tr));
+        });
+
+        this.setUpdateTime();
+    },
+};
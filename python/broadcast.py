@@ -0,0 +1,115 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import json
+import logging
+from collections import deque
+from tornado.websocket import WebSocketClosedError
+
+MAX_QUEUED_MESSAGES = 16  # Clients with more unsent messages than this are disconnected as slow consumers
+
+
+class ClientQueue:
+    __slots__ = ('messages', 'sending')
+
+    def __init__(self):
+        self.messages = deque()
+        self.sending = False
+
+
+class BroadcastHub:
+    def __init__(self, max_queued_messages=MAX_QUEUED_MESSAGES):
+        """
+        Fan messages out to the open websockets. Messages can be broadcast from any thread, they are
+        encoded once and handed to the server IOLoop, which owns the websockets and their send queues.
+
+        :param max_queued_messages: The maximum number of unsent messages per client.
+        """
+        self.max_queued_messages = max_queued_messages
+        self.io_loop = None
+        # websocket -> ClientQueue, only used on the IOLoop thread
+        self.clients = {}
+        # Counters
+        self.broadcast_messages = 0
+        self.dropped_clients = 0
+
+    def set_io_loop(self, io_loop):
+        """
+        Set the IOLoop the websockets belong to.
+
+        :param io_loop: The Tornado IOLoop of the web server.
+        """
+        self.io_loop = io_loop
+
+    def register(self, ws, initial_messages=()):
+        """
+        Add a websocket, must be called on the IOLoop thread.
+
+        :param ws: The websocket.
+        :param initial_messages: Encoded messages sent to the websocket ahead of any broadcast message.
+        """
+        client_queue = ClientQueue()
+        self.clients[ws] = client_queue
+        if initial_messages:
+            client_queue.messages.extend(initial_messages)
+            client_queue.sending = True
+            self.io_loop.add_callback(self.send_queued, ws, client_queue)
+
+    def unregister(self, ws):
+        """ Remove a websocket, must be called on the IOLoop thread. """
+        self.clients.pop(ws, None)
+
+    def broadcast(self, message):
+        """
+        Send a message to every open websocket, can be called from any thread.
+
+        :param message: The message, either a JSON string or an object to encode as JSON.
+        """
+        if self.io_loop is None:
+            logging.warning("No IOLoop to broadcast the message on.")
+            return
+        if not isinstance(message, str):
+            message = json.dumps(message)
+        self.io_loop.add_callback(self.fan_out, message)
+
+    def fan_out(self, message):
+        # Runs on the IOLoop, queue the message for every client and start sending where idle
+        self.broadcast_messages += 1
+        for ws, client_queue in list(self.clients.items()):
+            if len(client_queue.messages) >= self.max_queued_messages:
+                # Dropping messages would leave the client with a stale view, disconnect it instead
+                self.dropped_clients += 1
+                logging.warning(f"Disconnecting slow websocket client, {len(client_queue.messages)} messages queued.")
+                self.unregister(ws)
+                ws.close(code=1013, reason="Client too slow")
+                continue
+            client_queue.messages.append(message)
+            if not client_queue.sending:
+                client_queue.sending = True
+                self.io_loop.add_callback(self.send_queued, ws, client_queue)
+
+    async def send_queued(self, ws, client_queue):
+        # Send the queued messages of a client one by one, waiting for each to be flushed
+        try:
+            while client_queue.messages and self.clients.get(ws) is client_queue:
+                await ws.write_message(client_queue.messages.popleft())
+        except WebSocketClosedError:
+            self.unregister(ws)
+        finally:
+            client_queue.sending = False
@@ -17,6 +17,9 @@ or implied.
 
 """
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from python import simulation_cache
+from python import plan_export
 import com.cisco.wae.design
 from com.cisco.wae.design import ServiceConnectionManager
 from com.cisco.wae.design.model.net import TrafficLevelKey, ColumnRecord, ColumnType, ReportTable, ReportRecord, \
@@ -46,109 +49,346 @@ from com.cisco.wae.design.model.net import NamedPathRecord
 from com.cisco.wae.design.model.net import LSPPathRecord
 import Ice
 import json
-import random
 
 
 host = "10.135.7.127"
 port = "30744"
 protocol = 'ssl'
+# Number of interfaces requested per batched simulation result call
+INTERFACE_BATCH_SIZE = 1000
+# Simulation result cache settings
+SIMULATION_CACHE_SIZE = 32  # Maximum number of cached simulation results
+SIMULATION_CACHE_RATE_BUCKET = 1000  # Round demand rates to multiples of this (Mbps) when comparing, 0 for exact
+# Plan export settings
+PLAN_EXPORT_MODE = 'on_demand'  # 'disabled', 'interval', 'on_change' or 'on_demand'
+PLAN_EXPORT_INTERVAL = 10  # Simulations between exports in 'interval' mode
+PLAN_EXPORT_CHANGE_THRESHOLD = 0.2  # Fraction of changed demands that causes an export in 'on_change' mode
+PLAN_EXPORT_HISTORY = 5  # Number of exported plan files kept
+PLAN_EXPORT_DIR = 'plan_files/exports'
 conn = com.cisco.wae.design.ServiceConnectionManager.newServiceConnection(host, port, protocol)
 
-def run_simulation(traffic_data):
-    global conn
-    with open('plan_files/lab_topology_SR_FlexAlgo_renamed.pln', 'rb') as f:
-        plan = conn.getPlanManager().newPlanFromBytes(f.read())
-        f.close()
-    net = plan.getNetwork()
+with open('jsonfiles/aac_map.json', 'r') as file:
+    aac_map = json.load(file)
+with open('jsonfiles/sid_map.json', 'r') as file:
+    sid_map = json.load(file)
+
+
+class PlanSession:
+    def __init__(self, plan_file):
+        """
+        Keep the base plan loaded on the Crosswork Planning server between simulations. Each cycle
+        reconciles the demands in the plan with the traffic matrix, so only new, changed and vanished
+        demands cause calls to the server.
+
+        :param plan_file: The path of the base plan file.
+        """
+        with open(plan_file, 'rb') as f:
+            self.plan_bytes = f.read()
+        self.plan = None
+        self.circuit_data = None
+        self.node_names = None
+        # (source_router, locator_addr) -> the demand added to the base plan for that traffic entry
+        self.demands = {}
+        # Fingerprint of the demand set last simulated on the plan, a cached result can be for another one
+        self.fingerprint = None
+
+    def get_plan(self, conn):
+        """
+        Return the plan, uploading the base plan if it is not loaded on the server.
+
+        :param conn: The Crosswork Planning service connection.
+        :return: The plan.
+        """
+        if self.plan is None:
+            logging.info("Loading base plan into Crosswork Planning...")
+            self.plan = conn.getPlanManager().newPlanFromBytes(self.plan_bytes)
+            self.circuit_data = None
+            self.node_names = None
+            self.demands = {}
+            self.fingerprint = None
+            ensure_service_class(self.plan, 'Default')
+        return self.plan
+
+    def get_circuit_data(self):
+        """
+        Return the circuits of the plan, the topology does not change between simulations.
+
+        :return: Dictionary of circuit key to a dictionary holding the circuit.
+        """
+        if self.circuit_data is None:
+            selected_circuits = self.plan.getNetwork().getCircuitManager().getAllCircuits()
+            # Create a dictionary of dictionaries using the circuitKeys as the key values
+            self.circuit_data = {}
+            for circuit_key, circuit in selected_circuits.items():
+                self.circuit_data[circuit_key] = {}
+                self.circuit_data[circuit_key]['circuit'] = circuit
+        return self.circuit_data
+
+    def get_node_names(self):
+        """
+        Return the names of the nodes in the plan.
+
+        :return: A set of node names.
+        """
+        if self.node_names is None:
+            node_map = self.plan.getNetwork().getNodeManager().getAllNodes()
+            self.node_names = {node_key.name for node_key in node_map.keys()}
+        return self.node_names
+
+    def get_plan_demand(self, traffic_entry):
+        """
+        Describe the demand a traffic matrix entry maps to in the plan. Destinations missing from the
+        plan are replaced by their aggregation node from aac_map.
+
+        :param traffic_entry: A traffic matrix entry.
+        :return: A dictionary describing the demand, or None if the destination is not in the plan.
+        """
+        dest_node = traffic_entry['dest_router']
+        if dest_node not in self.get_node_names():
+            dest_node = aac_map.get(dest_node)
+            if dest_node is None:
+                return None
+        return {
+            'src_node': traffic_entry['source_router'],
+            'dest_node': dest_node,
+            'dest_sid': sid_map[traffic_entry['locator_addr']][0],
+            'dest_locator_addr': traffic_entry['locator_addr'],
+            'demand_name': traffic_entry['demand_name'],
+            'traffic': traffic_entry['traffic_rate'],
+        }
+
+    def reconcile_demands(self, traffic_data):
+        """
+        Bring the demands in the plan in line with the traffic matrix: add the new demands with their SR
+        LSPs, set the traffic of the changed demands and remove the vanished ones.
+
+        :param traffic_data: The traffic matrix entries.
+        :return: A dictionary with the number of 'added', 'updated' and 'removed' demands.
+        """
+        wanted = {}
+        for traffic_entry in traffic_data:
+            plan_demand = self.get_plan_demand(traffic_entry)
+            if plan_demand is None:
+                logging.info(f"Destination {traffic_entry['dest_router']} of demand {traffic_entry['demand_name']} "
+                             f"is not in the plan.")
+                continue
+            wanted[(plan_demand['src_node'], plan_demand['dest_locator_addr'])] = plan_demand
+
+        removed = []
+        updated = []
+        for entry_key, plan_demand in self.demands.items():
+            wanted_demand = wanted.get(entry_key)
+            if wanted_demand is None or get_demand_identity(wanted_demand) != get_demand_identity(plan_demand):
+                removed.append(entry_key)
+            elif wanted_demand['traffic'] != plan_demand['traffic']:
+                updated.append(entry_key)
+        replaced = set(removed)
+        added = [entry_key for entry_key in wanted.keys() if entry_key not in self.demands or entry_key in replaced]
 
-    with open('jsonfiles/aac_map.json', 'r') as file:
-        aac_map = json.load(file)
+        try:
+            self.remove_demands([self.demands.pop(entry_key) for entry_key in removed])
+            self.add_demands([wanted[entry_key] for entry_key in added])
+            for entry_key in added:
+                self.demands[entry_key] = wanted[entry_key]
+            self.set_demand_traffic([wanted[entry_key] for entry_key in updated])
+            for entry_key in updated:
+                self.demands[entry_key] = wanted[entry_key]
+        except Ice.ConnectionLostException:
+            raise
+        except Exception as err:
+            # The plan may hold part of the change now, start over from the base plan next cycle
+            logging.error(f"Could not apply the demand changes to the plan: {err}")
+            self.reset()
+        return {'added': len(added), 'updated': len(updated), 'removed': len(removed)}
+
+    def add_demands(self, plan_demands):
+        """
+        Add demands, each routed over a new SR LSP, to the plan, with one call per manager where the server
+        offers the bulk methods.
+
+        :param plan_demands: The demands to add, as returned by get_plan_demand.
+        """
+        if not plan_demands:
+            return
+        network = self.plan.getNetwork()
+        segment_list_recs = []
+        lsp_recs = []
+        lsp_path_recs = []
+        demand_recs = []
+        for plan_demand in plan_demands:
+            segment_list_rec, lsp_rec, lsp_path_rec = new_sr_lsp_records(plan_demand['src_node'],
+                                                                         plan_demand['dest_node'],
+                                                                         plan_demand['dest_sid'],
+                                                                         plan_demand['dest_locator_addr'])
+            segment_list_recs.append(segment_list_rec)
+            lsp_recs.append(lsp_rec)
+            lsp_path_recs.append(lsp_path_rec)
+            demand_recs.append(new_demand_record(plan_demand['src_node'], plan_demand['dest_node'], lsp_rec.name,
+                                                 plan_demand['demand_name']))
+        call_bulk(network.getSegmentListManager(), 'newSegmentLists', 'newSegmentList', segment_list_recs)
+        call_bulk(network.getLSPManager(), 'newLSPs', 'newLSP', lsp_recs)
+        call_bulk(network.getLSPPathManager(), 'newLSPPaths', 'newLSPPath', lsp_path_recs)
+        call_bulk(network.getDemandManager(), 'newDemands', 'newDemand', demand_recs)
+        self.set_demand_traffic(plan_demands)
+        dmd_traffic_mgr = self.plan.getTrafficManager().getDemandTrafficManager()
+        call_bulk(dmd_traffic_mgr, 'setGrowthPercents', 'setGrowthPercent',
+                  {get_demand_traffic_key(plan_demand): 10.0 for plan_demand in plan_demands})
+
+    def set_demand_traffic(self, plan_demands):
+        """
+        Set the traffic of demands in the plan with a single call.
+
+        :param plan_demands: The demands to set the traffic of, as returned by get_plan_demand.
+        """
+        if not plan_demands:
+            return
+        dmd_traffic_mgr = self.plan.getTrafficManager().getDemandTrafficManager()
+        call_bulk(dmd_traffic_mgr, 'setTraffics', 'setTraffic',
+                  {get_demand_traffic_key(plan_demand): plan_demand['traffic'] for plan_demand in plan_demands})
+
+    def remove_demands(self, plan_demands):
+        """
+        Remove demands and their SR LSPs and segment lists from the plan, with one call per manager where the
+        server offers the bulk methods.
+
+        :param plan_demands: The demands to remove, as returned by get_plan_demand.
+        """
+        if not plan_demands:
+            return
+        network = self.plan.getNetwork()
+        call_bulk(network.getDemandManager(), 'removeDemands', 'removeDemand',
+                  [get_demand_key(plan_demand) for plan_demand in plan_demands])
+        lsp_names = [get_sr_lsp_name(plan_demand['src_node'], plan_demand['dest_node'],
+                                     plan_demand['dest_locator_addr']) for plan_demand in plan_demands]
+        call_bulk(network.getLSPManager(), 'removeLSPs', 'removeLSP',
+                  [LSPKey(name=lsp_name, sourceKey=NodeKey(name=plan_demand['src_node']))
+                   for lsp_name, plan_demand in zip(lsp_names, plan_demands)])
+        call_bulk(network.getSegmentListManager(), 'removeSegmentLists', 'removeSegmentList',
+                  [SegmentListKey(name=lsp_name, sourceKey=NodeKey(name=plan_demand['src_node']))
+                   for lsp_name, plan_demand in zip(lsp_names, plan_demands)])
+
+    def reset(self):
+        """
+        Forget the plan, e.g. after the connection to the server was lost, it is uploaded again on next use.
+        """
+        self.plan = None
+        self.circuit_data = None
+        self.node_names = None
+        self.demands = {}
+        self.fingerprint = None
+
+
+plan_session = PlanSession('plan_files/lab_topology_SR_FlexAlgo_renamed.pln')
+# Every call to the planning server, simulations and plan downloads alike, runs on this single thread
+simulation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='simulation')
+simulation_results = simulation_cache.SimulationResultCache(SIMULATION_CACHE_SIZE, SIMULATION_CACHE_RATE_BUCKET)
+plan_exporter = plan_export.PlanExporter(lambda plan: plan.serializeToBytesForVersion(PlanFormat.PlnFile, '7.5'),
+                                         PLAN_EXPORT_DIR, simulation_executor, mode=PLAN_EXPORT_MODE,
+                                         interval=PLAN_EXPORT_INTERVAL, change_threshold=PLAN_EXPORT_CHANGE_THRESHOLD,
+                                         history=PLAN_EXPORT_HISTORY)
 
-    with open('jsonfiles/sid_map.json', 'r') as file:
-        sid_map = json.load(file)
 
-    with open('jsonfiles/node_name_lookup.json', 'r') as file:
-        node_names = json.load(file)
+def run_simulation(traffic_data):
+    """
+    Simulate the traffic matrix on the plan.
 
-    for demand in traffic_data:
-        nodeA = demand['source_router']
-        nodeB = demand['dest_router']
-        bw_A_B = demand['traffic_rate']
-        demand_name_A_B = demand['demand_name']
-        try:
-            lsp_name = new_sr_lsp(plan, src_node=nodeA, dest_node=nodeB, dest_sid=sid_map[demand['locator_addr']][0],
-                                  dest_locator_addr=demand['locator_addr'])
-            tmp_dmd = new_demand_for_LSP(plan, nodeA, nodeB, lsp_name, demand_name_A_B, bw_A_B)
-        except Exception as err:
-            if nodeB in aac_map:
-                nodeB_aac = aac_map[nodeB]
-                lsp_name = new_sr_lsp(plan, src_node=nodeA, dest_node=nodeB_aac,
-                                      dest_sid=sid_map[demand['locator_addr']][0],
-                                      dest_locator_addr=demand['locator_addr'])
-                tmp_dmd = new_demand_for_LSP(plan, nodeA, nodeB_aac, lsp_name, demand_name_A_B, bw_A_B)
-
-    selected_circuits = net.getCircuitManager().getAllCircuits()
-
-    # Now that the circuits are chosen, create a dictionary of dictionaries using
-    # the circuitKeys as the key values
-    circuit_data = {}
-    for circuit_key, circuit in selected_circuits.items():
-        circuit_data[circuit_key] = {}
-        circuit_data[circuit_key]['circuit'] = circuit
+    :param traffic_data: The traffic matrix entries.
+    :return: The interface data, or None if the simulation could not be run.
+    """
+    global conn
+    # Demand sets seen before, up to the rate bucket, reuse their results without running the simulation. The
+    # plan keeps the demands of the last simulation, the exporter is told so it does not export them as these
+    fingerprint = simulation_results.get_fingerprint(traffic_data)
+    interface_data = simulation_results.get(fingerprint)
+    if interface_data is not None:
+        logging.info(f"Demands unchanged, reusing simulation results ({simulation_results.hits} hits, "
+                     f"{simulation_results.misses} misses).")
+        plan_exporter.on_cached_result(fingerprint)
+        return interface_data
     try:
+        plan = plan_session.get_plan(conn)
+        changes = plan_session.reconcile_demands(traffic_data)
+        if plan_session.plan is None:
+            # The changes could not be applied, start over from the base plan
+            plan = plan_session.get_plan(conn)
+            changes = plan_session.reconcile_demands(traffic_data)
+            if plan_session.plan is None:
+                return None
+        logging.info(f"Reconciled plan demands: {changes['added']} added, {changes['updated']} updated, "
+                     f"{changes['removed']} removed.")
+        circuit_data = plan_session.get_circuit_data()
         interface_data = get_util_interfaces(conn, plan, circuit_data)
     except Ice.ConnectionLostException  as err:
         logging.error(err)
         logging.info("Creating new Crosswork connection...")
         conn = com.cisco.wae.design.ServiceConnectionManager.newServiceConnection(host, port, protocol)
+        plan_session.reset()
+        return None
 
     logging.info("Simulation analysis completed.")
+    plan_session.fingerprint = fingerprint
+    simulation_results.put(fingerprint, interface_data)
+    plan_exporter.on_simulation(plan, changes, len(traffic_data), fingerprint)
 
+    return interface_data
 
-    node_manager = plan.getNetwork().getNodeManager()
-    node_map = node_manager.getAllNodes()
-    node_coordinates = {}
-    for node_key, node in node_map.items():
-        latitude = node.getLatitude()
-        longitude = node.getLongitude()
-        node_coordinates[node_key] = (latitude, longitude)
 
-    try:
-        serialized_bytes = plan.serializeToBytesForVersion(PlanFormat.PlnFile, '7.5')
-        # serialized_bytes = plan.serializeToBytes(PlanFormat.PlnFile)
-        with open("plan_files/plan_out.pln", "wb") as file:
-            file.write(serialized_bytes)
-        logging.info("Serialized plan file to bytes.")
-    except Exception as err:
-        logging.error("Could not save the plan file to file system!")
+def call_bulk(manager, bulk_method, single_method, items):
+    """
+    Call the plural variant of a manager method with all items at once if the server offers it, otherwise
+    call the singular method once per item.
 
-    return interface_data
+    :param manager: The Crosswork Planning manager proxy.
+    :param bulk_method: The name of the plural method, taking a list or a dictionary.
+    :param single_method: The name of the singular method, taking one item or one key and value.
+    :param items: A list of items, or a dictionary passed to the singular method as key and value.
+    """
+    if hasattr(manager, bulk_method):
+        getattr(manager, bulk_method)(items)
+        return
+    single_call = getattr(manager, single_method)
+    if isinstance(items, dict):
+        for key, value in items.items():
+            single_call(key, value)
+    else:
+        for item in items:
+            single_call(item)
 
 
-def new_sr_lsp(plan, src_node, dest_node, dest_sid, dest_locator_addr):
-    random_num = random.random()
-    hop_type = SegmentListHopType.SEGMENTLISTHOPTYPE_NODE
+def ensure_service_class(plan, service_class):
+    """
+    Add a service class to the plan if it does not have it.
+
+    :param plan: The plan.
+    :param service_class: The name of the service class.
+    """
+    serviceClassMgr = plan.getNetwork().getServiceClassManager()
+    if not serviceClassMgr.hasServiceClass(ServiceClassKey(name=service_class)):
+        serviceClassMgr.newServiceClass(ServiceClassRecord(name=service_class))
+
+
+def get_sr_lsp_name(src_node, dest_node, dest_locator_addr):
+    return f"{src_node}-{dest_node}-{dest_locator_addr}"
+
+
+def new_sr_lsp_records(src_node, dest_node, dest_sid, dest_locator_addr):
+    """
+    Build the records of an SR LSP to a destination SID: its segment list, the LSP and the LSP path
+    that binds them. The segment list and the LSP share the same name.
+
+    :return: A (segment list record, LSP record, LSP path record) tuple.
+    """
     segment_list_hop_rec = SegmentListHopRecord(
-        hopType=hop_type,
+        hopType=SegmentListHopType.SEGMENTLISTHOPTYPE_NODE,
         nodeHop=NodeKey(dest_node),
         sid=int(dest_sid),
     )
-    segment_list_hop_rec_list = []
-    segment_list_hop_rec_list.append(segment_list_hop_rec)
-    segment_list_name = f"{src_node}-{dest_node}-{dest_locator_addr}"
+    lsp_name = get_sr_lsp_name(src_node, dest_node, dest_locator_addr)
     segment_list_rec = SegmentListRecord(
-        name=segment_list_name,
+        name=lsp_name,
         sourceKey=NodeKey(src_node),
-        hops=segment_list_hop_rec_list,
+        hops=[segment_list_hop_rec],
     )
-    segment_list_manager = plan.getNetwork().getSegmentListManager()
-    # sl_key = SegmentListKey(name=segment_list_name,sourceKey=NodeKey(src_node))
-    # if segment_list_manager.hasSegmentList(sl_key):
-    #     segment_list = segment_list_manager.getSegmentList(sl_key)
-    # else:
-    segment_list = segment_list_manager.newSegmentList(segment_list_rec)
-    # lsp_name = f"{src_node}-{dest_node}-{dest_sid}--{random_num}"
-    lsp_name = f"{src_node}-{dest_node}-{dest_locator_addr}"
     lspRec = LSPRecord(
         sourceKey=NodeKey(name=src_node),
         name=lsp_name,
@@ -157,34 +397,17 @@ def new_sr_lsp(plan, src_node, dest_node, dest_sid, dest_locator_addr):
         isPrivate=True,
         type=LSPType.SegmentRouting,
     )
-    lspMgr = plan.getNetwork().getLSPManager()
-    lsp = lspMgr.newLSP(lspRec)
-
-    lspRecord = lsp.getRecord()
-    lspKey = lsp.getKey()
-
     lspPathRecord = LSPPathRecord(
-        lKey=lspKey,
+        lKey=LSPKey(name=lsp_name, sourceKey=NodeKey(name=src_node)),
         pathOption=1,
-        segListKey=segment_list.getKey(),
+        segListKey=SegmentListKey(name=lsp_name, sourceKey=NodeKey(name=src_node)),
         active=True,
     )
-    lspPathManager = plan.getNetwork().getLSPPathManager()
-    lspPath = lspPathManager.newLSPPath(lspPathRecord)
-    return lsp_name
-
-
-def new_demand_for_LSP(id, src, dest, lspName, demandName, val):
-    serviceClass = 'Default'
-    serviceClassMgr = id.getNetwork().getServiceClassManager()
-    serviceClassExists = serviceClassMgr.hasServiceClass(
-        ServiceClassKey(name=serviceClass))
-    if not serviceClassExists:
-        serviceClassRecord = ServiceClassRecord(name=serviceClass)
-        serviceClassMgr.newServiceClass(serviceClassRecord)
-
-    # keylist = serviceClassMgr.getAllServiceClassKeys()
-    dmdRec = DemandRecord(
+    return segment_list_rec, lspRec, lspPathRecord
+
+
+def new_demand_record(src, dest, lspName, demandName):
+    return DemandRecord(
         name=demandName,
         source=DemandEndpointKey(key=src),
         destination=DemandEndpointKey(key=dest),
@@ -194,23 +417,63 @@ def new_demand_for_LSP(id, src, dest, lspName, demandName, val):
             sourceKey=NodeKey(name=src)
         )
     )
-    dmdMgr = id.getNetwork().getDemandManager()
-    new_demand = dmdMgr.newDemand(dmdRec)
 
-    dmdTraffKey = DemandTrafficKey(
+
+def get_demand_key(plan_demand):
+    return DemandKey(
+        name=plan_demand['demand_name'],
+        source=DemandEndpointKey(key=plan_demand['src_node']),
+        destination=DemandEndpointKey(key=plan_demand['dest_node']),
+        serviceClass=ServiceClassKey(name='Default'),
+    )
+
+
+def get_demand_traffic_key(plan_demand):
+    return DemandTrafficKey(
         traffLvlKey=TrafficLevelKey(name='Default'),
-        dmdKey=DemandKey(
-            name=demandName,
-            source=DemandEndpointKey(key=src),
-            destination=DemandEndpointKey(key=dest),
-            serviceClass=ServiceClassKey(name='Default'),
-        )
+        dmdKey=get_demand_key(plan_demand)
     )
-    dmdTrafficMgr = id.getTrafficManager().getDemandTrafficManager()
-    dmdTrafficMgr.setTraffic(dmdTraffKey, val)
-    dmdTrafficMgr.setGrowthPercent(dmdTraffKey, 10.0)
 
-    return new_demand
+
+def get_demand_identity(plan_demand):
+    """ The fields that name a demand and its SR LSP in the plan, a change means replacing the demand. """
+    return plan_demand['dest_node'], plan_demand['dest_sid'], plan_demand['demand_name']
+
+
+def get_interface_wc_records(sim, intf_keys):
+    """
+    Get the worst-case records of interfaces from a simulation analysis, INTERFACE_BATCH_SIZE interfaces
+    per call. Falls back to a call per interface if the server does not offer the batched variant.
+
+    :param sim: The simulation analysis that has been run.
+    :param intf_keys: The interface keys.
+    :return: Generator of (interface key, worst-case record) tuples.
+    """
+    if hasattr(sim, 'getInterfacesWCRecords'):
+        for start in range(0, len(intf_keys), INTERFACE_BATCH_SIZE):
+            wc_result_map = sim.getInterfacesWCRecords(intf_keys[start:start + INTERFACE_BATCH_SIZE])
+            for intf, wc_result_recs in wc_result_map.items():
+                for wc_result in wc_result_recs:
+                    yield intf, wc_result
+    else:
+        for intf in intf_keys:
+            for wc_result in sim.getInterfaceWCRecords(intf):
+                yield intf, wc_result
+
+
+def get_interface_simulated_traffic_records(trf_sim, intf_keys):
+    """
+    Get the simulated traffic records of interfaces, INTERFACE_BATCH_SIZE interfaces per call.
+
+    :param trf_sim: The traffic simulation.
+    :param intf_keys: The interface keys.
+    :return: Generator of simulated traffic records.
+    """
+    for start in range(0, len(intf_keys), INTERFACE_BATCH_SIZE):
+        batch = intf_keys[start:start + INTERFACE_BATCH_SIZE]
+        simulated_traff_map = trf_sim.getInterfacesSimulatedTrafficRecords(batch)
+        for int_sim_traff_record in simulated_traff_map.values():
+            yield int_sim_traff_record
 
 
 def get_util_interfaces(conn, plan, circuit_data):
@@ -227,73 +490,41 @@ def get_util_interfaces(conn, plan, circuit_data):
         #           SAFailureType.SA_FAILURETYPE_NODES]
     )
     sim.run(network, sim_options)
-    interface_dict = {}
-    # obtain highest wcUtil results per circuit
+    # Both interfaces of every circuit, with the node at the other end of the circuit
+    neighbor_by_intf = {}
     for circuit in circuit_data.keys():
-        intf_list = [circuit.interfaceAKey, circuit.interfaceBKey]
-        for intf in intf_list:
-            # Set other_intf as the one not currently used
-            other_intf = circuit.interfaceBKey if intf == circuit.interfaceAKey else circuit.interfaceAKey
-            wc_result_recs = sim.getInterfaceWCRecords(intf)
-            for wc_result in wc_result_recs:
-                if wc_result != Ice.Unset:
-                    try:
-                        if wc_result.wcTraffic > interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                            'worst-case-traffic']:
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'worst-case-traffic'] = int(wc_result.wcTraffic)
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'worst-case-util'] = round(wc_result.wcUtil,1)
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'failure-scenario'] = wc_result.failureScenario
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'neighbor'] = other_intf.sourceKey.name
-                    except Exception as err:
-                        try:
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name] = {
-                                'worst-case-traffic': int(wc_result.wcTraffic)}
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'worst-case-util'] = round(wc_result.wcUtil,1)
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'failure-scenario'] = wc_result.failureScenario
-                            interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                'neighbor'] = other_intf.sourceKey.name
-                        except Exception as err:
-                            try:
-                                interface_dict[wc_result.iface.sourceKey.name] = {
-                                    wc_result.iface.name: {'worst-case-traffic': int(wc_result.wcTraffic)}}
-                                interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                    'worst-case-util'] = round(wc_result.wcUtil,1)
-                                interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                    'failure-scenario'] = wc_result.failureScenario
-                                interface_dict[wc_result.iface.sourceKey.name][wc_result.iface.name][
-                                    'neighbor'] = other_intf.sourceKey.name
-                            except Exception as err:
-                                logging.info(f"Could not get worst-case-traffic for {circuit}")
+        neighbor_by_intf[circuit.interfaceAKey] = circuit.interfaceBKey.sourceKey.name
+        neighbor_by_intf[circuit.interfaceBKey] = circuit.interfaceAKey.sourceKey.name
+    intf_keys = list(neighbor_by_intf.keys())
+
+    interface_dict = {}
+    # obtain highest wcUtil results per interface
+    for intf, wc_result in get_interface_wc_records(sim, intf_keys):
+        if wc_result == Ice.Unset:
+            continue
+        intf_entry = interface_dict.setdefault(wc_result.iface.sourceKey.name, {}).setdefault(wc_result.iface.name, {})
+        if 'worst-case-traffic' not in intf_entry or wc_result.wcTraffic > intf_entry['worst-case-traffic']:
+            intf_entry['worst-case-traffic'] = int(wc_result.wcTraffic)
+            intf_entry['worst-case-util'] = round(wc_result.wcUtil, 1)
+            intf_entry['failure-scenario'] = wc_result.failureScenario
+            intf_entry['neighbor'] = neighbor_by_intf[intf]
+
     sim = conn.getSimulationManager()
     r_sim = sim.newRouteSimulation(plan, FailureScenarioRecord())
     trf_sim = sim.newTrafficSimulation(r_sim, plan.getNetwork().getTrafficLevelManager().getTrafficLevel(
         TrafficLevelKey(name='Default')), None)
-    for circuit in circuit_data.keys():
-        intf_list = [circuit.interfaceAKey, circuit.interfaceBKey]
-        for intf in intf_list:
-            simulated_traff_map = trf_sim.getInterfacesSimulatedTrafficRecords([intf])
-            for interface_key, int_sim_traff_record in simulated_traff_map.items():
-                if int_sim_traff_record != Ice.Unset:
-                    try:
-                        interface_dict[int_sim_traff_record.ifaceKey.sourceKey.name][
-                            int_sim_traff_record.ifaceKey.name][
-                            'traffic'] = int(int_sim_traff_record.trafficSim)
-                        interface_dict[int_sim_traff_record.ifaceKey.sourceKey.name][
-                            int_sim_traff_record.ifaceKey.name][
-                            'capacity'] = int(int_sim_traff_record.capacitySim)
-                        interface_dict[int_sim_traff_record.ifaceKey.sourceKey.name][
-                            int_sim_traff_record.ifaceKey.name][
-                            'util'] = round(int_sim_traff_record.utilSim,1)
-                    except Exception as err:
-                        logging.info(f"Could not get traffic for {circuit}")
+    for int_sim_traff_record in get_interface_simulated_traffic_records(trf_sim, intf_keys):
+        if int_sim_traff_record == Ice.Unset:
+            continue
+        intf_entry = interface_dict.get(int_sim_traff_record.ifaceKey.sourceKey.name, {}).get(
+            int_sim_traff_record.ifaceKey.name)
+        if intf_entry is None:
+            logging.info(f"Could not get traffic for {int_sim_traff_record.ifaceKey}")
+            continue
+        intf_entry['traffic'] = int(int_sim_traff_record.trafficSim)
+        intf_entry['capacity'] = int(int_sim_traff_record.capacitySim)
+        intf_entry['util'] = round(int_sim_traff_record.utilSim, 1)
     return interface_dict
 
-
 if __name__ == '__main__':
     main()
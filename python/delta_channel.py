@@ -0,0 +1,65 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import json
+
+
+def encode_message(message):
+    # Compact JSON, the messages go to every client
+    return json.dumps(message, separators=(',', ':'))
+
+
+class DeltaChannel:
+    def __init__(self, target):
+        """
+        Track the rows published to the web clients for one target, e.g. 'traffic' or 'interface'. Each
+        update produces a delta message with only the changed and removed rows, and refreshes the
+        snapshot message sent to clients when they connect.
+
+        Messages carry a version. A delta applies to the version in its 'base' field, snapshots replace
+        the client's rows and version.
+
+        :param target: The name of the target in the messages.
+        """
+        self.target = target
+        self.version = 0
+        self.rows = {}
+        # Replaced, never modified, so other threads can read it at any time
+        self.snapshot_json = self.encode_snapshot()
+
+    def encode_snapshot(self):
+        return encode_message({'target': self.target, 'type': 'snapshot', 'version': self.version,
+                               'rows': list(self.rows.values())})
+
+    def update(self, rows):
+        """
+        Replace the rows of the channel.
+
+        :param rows: Dictionary of row key to row, the rows must not be modified afterwards.
+        :return: The encoded delta message, or None if no row changed.
+        """
+        upsert = [row for key, row in rows.items() if self.rows.get(key) != row]
+        remove = [key for key in self.rows.keys() if key not in rows]
+        if not upsert and not remove:
+            return None
+        self.version += 1
+        self.rows = rows
+        self.snapshot_json = self.encode_snapshot()
+        return encode_message({'target': self.target, 'type': 'delta', 'version': self.version,
+                               'base': self.version - 1, 'upsert': upsert, 'remove': remove})
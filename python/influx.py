@@ -0,0 +1,349 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import asyncio
+import calendar
+import gzip
+import json
+import logging
+import time
+import dateutil.parser
+from python import utils
+
+# Epoch of recently parsed whole-second time stamps
+epoch_cache = {}
+
+
+def rfc3339_to_epoch(rfc3339_string):
+    # Fast path for the UTC 'YYYY-MM-DDTHH:MM:SS[.fraction]Z' strings returned by Influx, the epoch of
+    # each whole second is cached since most data points of a cycle share a handful of seconds
+    if len(rfc3339_string) >= 20 and rfc3339_string[-1] == 'Z' and rfc3339_string[19] in '.Z':
+        seconds_string = rfc3339_string[:19]
+        epoch_time = epoch_cache.get(seconds_string)
+        if epoch_time is not None:
+            return epoch_time
+        if seconds_string[4] == '-' and seconds_string[7] == '-' and seconds_string[10] == 'T' \
+                and seconds_string[13] == ':' and seconds_string[16] == ':':
+            try:
+                epoch_time = calendar.timegm((int(seconds_string[0:4]), int(seconds_string[5:7]),
+                                              int(seconds_string[8:10]), int(seconds_string[11:13]),
+                                              int(seconds_string[14:16]), int(seconds_string[17:19])))
+            except ValueError:
+                epoch_time = None
+            if epoch_time is not None:
+                if len(epoch_cache) >= 4096:
+                    epoch_cache.clear()
+                epoch_cache[seconds_string] = epoch_time
+                return epoch_time
+
+    # Parse any other RFC 3339 date-time string into a datetime object
+    dt = dateutil.parser.isoparse(rfc3339_string)
+
+    # Convert the datetime object to epoch time (Unix timestamp)
+    epoch_time = int(dt.timestamp())
+    return epoch_time
+
+
+class InfluxChunkDecoder:
+    def __init__(self, series_callback):
+        """
+        Initialize a decoder for Influx query responses in chunked mode, where the body is a sequence of
+        newline separated JSON documents. Series are passed to series_callback one at a time as soon as
+        the document holding them is complete, so the whole body is never held in memory.
+
+        :param series_callback: Function called with each series dictionary.
+        """
+        self.series_callback = series_callback
+        self.buffer = bytearray()
+        # A series split over several chunks is flagged partial, its values continue in the next chunk
+        self.partial_series = None
+        self.error = None
+
+    def feed(self, data):
+        """
+        Decode the complete documents in a chunk of the response body. Used as a streaming callback.
+
+        :param data: The bytes received.
+        """
+        self.buffer += data
+        start = 0
+        end = self.buffer.find(b'\n', start)
+        while end >= 0:
+            self.decode_document(bytes(self.buffer[start:end]))
+            start = end + 1
+            end = self.buffer.find(b'\n', start)
+        del self.buffer[:start]
+
+    def close(self):
+        """
+        Decode any document left without a trailing newline and flush a pending partial series.
+        """
+        if self.buffer.strip():
+            self.decode_document(bytes(self.buffer))
+        self.buffer = bytearray()
+        if self.partial_series is not None:
+            self.series_callback(self.partial_series)
+            self.partial_series = None
+
+    def decode_document(self, document):
+        # Decode one JSON document of the response and pass on its series
+        if not document.strip():
+            return
+        try:
+            document_dict = json.loads(document)
+        except Exception as err:
+            logging.info(f"Could not decode influx response chunk: {err}")
+            self.error = err
+            return
+        for result in document_dict.get('results', []):
+            if 'error' in result:
+                logging.info(f"Influx query error: {result['error']}")
+                self.error = result['error']
+            for series in result.get('series', []):
+                self.add_series(series)
+
+    def add_series(self, series):
+        # Merge the continuation of a partial series, otherwise pass the previous series on
+        partial = series.pop('partial', False)
+        if self.partial_series is not None:
+            if series.get('name') == self.partial_series.get('name') and \
+                    series.get('tags') == self.partial_series.get('tags'):
+                self.partial_series['values'].extend(series.get('values', []))
+                series = self.partial_series
+            else:
+                self.series_callback(self.partial_series)
+            self.partial_series = None
+        if partial:
+            self.partial_series = series
+        else:
+            self.series_callback(series)
+
+
+class OrderedSeriesDelivery:
+    def __init__(self, query_count, series_callback):
+        """
+        Initialize the in-order delivery of the series of concurrent queries. The series of the earliest
+        unfinished query go to series_callback as soon as they are decoded, the series of later queries are
+        buffered until every query before them has finished. Only the queries finishing ahead of their turn
+        are held in memory.
+
+        :param query_count: The number of queries, numbered from 0 in delivery order.
+        :param series_callback: Function called with each series dictionary, in query order.
+        """
+        self.series_callback = series_callback
+        self.buffers = [[] for _ in range(query_count)]
+        self.finished = [False] * query_count
+        self.current_query = 0
+
+    def deliver(self, query_index, series):
+        """
+        Pass on a series of a query, or buffer it until the query's turn.
+
+        :param query_index: The number of the query the series belongs to.
+        :param series: The series dictionary.
+        """
+        if query_index == self.current_query:
+            self.series_callback(series)
+        else:
+            self.buffers[query_index].append(series)
+
+    def finish(self, query_index):
+        """
+        Mark a query as finished, successfully or not, and pass on the series buffered for the queries whose
+        turn has come.
+
+        :param query_index: The number of the finished query.
+        """
+        self.finished[query_index] = True
+        while self.current_query < len(self.finished):
+            buffered_series, self.buffers[self.current_query] = self.buffers[self.current_query], []
+            for series in buffered_series:
+                self.series_callback(series)
+            if not self.finished[self.current_query]:
+                break
+            self.current_query += 1
+
+
+def escape_measurement(measurement):
+    # Escape a measurement name for line protocol
+    return measurement.replace(',', '\\,').replace(' ', '\\ ')
+
+
+def escape_key(key):
+    # Escape a tag key, tag value or field key for line protocol
+    return key.replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+
+def format_field_value(value):
+    # Numbers are written as floats like the existing router_metrics fields, strings are quoted
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def format_point(measurement, tags, fields, time_stamp=None):
+    """
+    Format a point in line protocol.
+
+    :param measurement: The name of the measurement.
+    :param tags: Dictionary of tag keys and values.
+    :param fields: Dictionary of field keys and values, None values are left out.
+    :param time_stamp: Optional time stamp in the precision of the write.
+    :return: The line protocol string, or None if the point has no fields.
+    """
+    field_set = ','.join(f"{escape_key(key)}={format_field_value(value)}"
+                         for key, value in fields.items() if value is not None)
+    if not field_set:
+        return None
+    line = escape_measurement(measurement)
+    for key, value in tags.items():
+        if value is not None and value != '':
+            line += f",{escape_key(key)}={escape_key(str(value))}"
+    line += f" {field_set}"
+    if time_stamp is not None:
+        line += f" {time_stamp}"
+    return line
+
+
+def format_schema_points(schema, records, time_stamp=None):
+    """
+    Format records as line protocol according to a schema.
+
+    :param schema: Dictionary with the 'measurement' name and the 'tags' and 'fields' to write, each a
+                   dictionary of tag or field key to the record key holding its value.
+    :param records: Iterable of record dictionaries.
+    :param time_stamp: Optional time stamp for all of the points.
+    :return: A list of line protocol strings.
+    """
+    lines = []
+    for record in records:
+        line = format_point(schema['measurement'],
+                            {key: record.get(record_key) for key, record_key in schema['tags'].items()},
+                            {key: record.get(record_key) for key, record_key in schema['fields'].items()},
+                            time_stamp)
+        if line is not None:
+            lines.append(line)
+    return lines
+
+
+class InfluxLineWriter:
+    def __init__(self, write_url, precision='s', max_batch_bytes=1024 * 1024, use_gzip=False, max_pending_batches=16,
+                 retries=3, retry_delay=2, request_timeout=30):
+        """
+        Initialize a writer that sends line protocol to Influx in size-capped batches from a background
+        task, so callers only queue the points.
+
+        :param write_url: The Influx write URL, including the database.
+        :param precision: The precision of the point time stamps ('s', 'ms', 'u' or 'ns').
+        :param max_batch_bytes: Maximum size of the body of a single write.
+        :param use_gzip: Compress the body of the writes.
+        :param max_pending_batches: Maximum number of queued batches, the oldest are dropped beyond it.
+        :param retries: Additional attempts for a failed write.
+        :param retry_delay: Seconds to wait before retrying, doubled after every attempt.
+        :param request_timeout: Timeout of a single write in seconds.
+        """
+        separator = '&' if '?' in write_url else '?'
+        self.write_url = f"{write_url}{separator}precision={precision}"
+        self.precision = precision
+        self.max_batch_bytes = max_batch_bytes
+        self.use_gzip = use_gzip
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.request_timeout = request_timeout
+        self.queue = asyncio.Queue(maxsize=max_pending_batches)
+        self.task = None
+        # Counters of the points written and the batches written, failed and dropped by back-pressure
+        self.written_points = 0
+        self.written_batches = 0
+        self.failed_batches = 0
+        self.dropped_batches = 0
+
+    def get_time_stamp(self):
+        """
+        Return the current time in the precision of the writer.
+        """
+        return time.time_ns() // {'s': 10 ** 9, 'ms': 10 ** 6, 'u': 10 ** 3, 'ns': 1}[self.precision]
+
+    def start(self):
+        """
+        Start the background task sending the batches, if it is not running.
+        """
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.run())
+
+    def write(self, lines):
+        """
+        Queue lines of line protocol to be written, split into batches of at most max_batch_bytes.
+
+        :param lines: The lines of line protocol.
+        """
+        batch = []
+        batch_bytes = 0
+        for line in lines:
+            line_bytes = len(line) + 1
+            if batch and batch_bytes + line_bytes > self.max_batch_bytes:
+                self.queue_batch(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(line)
+            batch_bytes += line_bytes
+        if batch:
+            self.queue_batch(batch)
+
+    def queue_batch(self, batch):
+        # Apply back-pressure by dropping the oldest batch when the queue is full
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped_batches += 1
+            logging.warning("Influx write queue is full, dropped the oldest batch.")
+        self.queue.put_nowait(batch)
+
+    async def run(self):
+        # Send the queued batches one at a time
+        while True:
+            batch = await self.queue.get()
+            try:
+                await self.send_batch(batch)
+            finally:
+                self.queue.task_done()
+
+    async def send_batch(self, batch):
+        # Send one batch, retrying with an increasing delay
+        body = '\n'.join(batch).encode('utf-8')
+        headers = {'content-type': 'text/plain; charset=utf-8'}
+        if self.use_gzip:
+            body = gzip.compress(body)
+            headers['content-encoding'] = 'gzip'
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            response = await utils.rest_post_tornado_httpclient(self.write_url, data=body, headers=headers,
+                                                               request_timeout=self.request_timeout)
+            if not response.startswith(('Error:', 'Failed HTTP response')):
+                self.written_points += len(batch)
+                self.written_batches += 1
+                return True
+            logging.info(f"Influx write of {len(batch)} points failed (attempt {attempt + 1}): {response}")
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        self.failed_batches += 1
+        return False
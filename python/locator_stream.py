@@ -0,0 +1,104 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import asyncio
+import json
+import logging
+
+# Telegraf metrics are expected in the json data format, one metric or a {"metrics": [...]} batch per record
+
+
+def decode_telegraf_record(record):
+    """ Decode one telegraf json record into a list of metric dicts. """
+    try:
+        record_dict = json.loads(record)
+    except Exception as err:
+        logging.info(f"Could not decode telegraf record: {err}")
+        return []
+    if 'metrics' in record_dict:
+        return record_dict['metrics']
+    return [record_dict]
+
+
+async def kafka_source(topic, bootstrap_servers, group_id='sr-traffic-mgmt'):
+    """ Yield telegraf metrics consumed from a Kafka topic. """
+    # Only the Kafka ingest mode needs aiokafka, the other modes start without it installed
+    from aiokafka import AIOKafkaConsumer
+    consumer = AIOKafkaConsumer(topic, bootstrap_servers=bootstrap_servers, group_id=group_id,
+                                auto_offset_reset='latest')
+    await consumer.start()
+    logging.info(f"Consuming telemetry from Kafka topic {topic} at {bootstrap_servers}...")
+    try:
+        async for message in consumer:
+            for metric in decode_telegraf_record(message.value):
+                yield metric
+    finally:
+        await consumer.stop()
+
+
+async def file_source(path, speed=1.0):
+    """
+    Replay telegraf metrics recorded one record per line in a file.
+
+    :param path: The file holding the recorded telegraf records.
+    :param speed: Replay speed relative to the recorded timestamps, 0 replays as fast as possible.
+    """
+    logging.info(f"Replaying telemetry from file {path}...")
+    last_time_stamp = None
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            for metric in decode_telegraf_record(line):
+                time_stamp = metric.get('timestamp')
+                if speed > 0 and last_time_stamp is not None and time_stamp is not None \
+                        and time_stamp > last_time_stamp:
+                    await asyncio.sleep((time_stamp - last_time_stamp) / speed)
+                if time_stamp is not None:
+                    last_time_stamp = time_stamp
+                yield metric
+
+
+async def socket_source(host, port):
+    """ Yield telegraf metrics read one record per line from a TCP socket. """
+    reader, writer = await asyncio.open_connection(host, port)
+    logging.info(f"Reading telemetry from socket {host}:{port}...")
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            for metric in decode_telegraf_record(line):
+                yield metric
+    finally:
+        writer.close()
+
+
+def replay_source(source, speed=1.0):
+    """
+    Return a replay source for either a file path or a host:port socket address.
+
+    :param source: The file path or host:port to read telegraf records from.
+    :param speed: Replay speed for file sources.
+    """
+    host, sep, port = source.rpartition(':')
+    if sep and port.isdigit():
+        return socket_source(host, int(port))
+    return file_source(source, speed)
@@ -20,6 +20,9 @@ or implied.
 import json
 import logging
 import python.utils
+from python import crosswork_planning
+from python import telemetry
+from python import rpc
 
 
 async def send_async_request(url, user, password):
@@ -43,12 +46,33 @@ async def send_async_request(url, user, password):
 
 
 def get_response():
-    with open("../jsongets/traffic_matrix.json", 'r', ) as f:
-        response = json.load(f)
-        f.close()
-    return json.dumps(response)
+    # The latest traffic matrix is kept encoded in memory
+    return telemetry.snapshots.get('traffic_matrix').body.decode()
+
+
+def export_plan():
+    started = crosswork_planning.plan_exporter.request_export()
+    return {'action': 'export-plan', 'status': 'started' if started else 'skipped'}
+
+
+def query_traffic_matrix(source_router=None, dest_router=None, algo_name=None, locator_addr=None, top=None):
+    return telemetry.local_traffic_matrix.query(source_router=source_router, dest_router=dest_router,
+                                                algo_name=algo_name, locator_addr=locator_addr, top=top)
+
+
+def get_traffic_aggregates():
+    return telemetry.local_traffic_matrix.get_aggregates()
 
 
 def process_ws_message(message):
     response = "Got the message from websocket, here's my reply"
     return response
+
+
+# Methods callable over the websocket
+rpc_methods = rpc.RpcRegistry()
+rpc_methods.register('process_ws_message', process_ws_message)
+rpc_methods.register('get_response', get_response)
+rpc_methods.register('export_plan', export_plan)
+rpc_methods.register('query_traffic_matrix', query_traffic_matrix)
+rpc_methods.register('get_traffic_aggregates', get_traffic_aggregates)
@@ -0,0 +1,213 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from python import errors
+
+EXPORT_MODES = ('disabled', 'interval', 'on_change', 'on_demand')
+
+
+class PlanExporter:
+    def __init__(self, serialize, export_dir, simulation_executor, mode='on_demand', interval=10,
+                 change_threshold=0.2, history=5):
+        """
+        Export simulated plans to the file system according to a snapshot policy. The plan is downloaded
+        on the simulation thread between two simulations, so an export never sees a plan that is half way
+        through reconciling the next traffic matrix. Only the disk write runs on the export thread.
+
+        :param serialize: Function of the plan returning the plan file bytes.
+        :param export_dir: The directory holding the exported plan files.
+        :param simulation_executor: The single worker executor running the simulations, requested exports
+                                    are downloaded on it between simulations.
+        :param mode: 'disabled' never exports, 'interval' exports every interval simulations, 'on_change'
+                     exports when the demands changed significantly, 'on_demand' only exports on request.
+                     Exports can be requested in every mode but 'disabled'.
+        :param interval: The number of simulations between exports in 'interval' mode.
+        :param change_threshold: The fraction of demands added, updated or removed by a simulation that
+                                 causes an export in 'on_change' mode.
+        :param history: The number of exported plan files kept, older files are deleted.
+        """
+        if mode not in EXPORT_MODES:
+            raise errors.InputError("mode", f"The plan export mode must be one of {', '.join(EXPORT_MODES)}.")
+        if interval < 1 or history < 1:
+            raise errors.InputError("interval, history", "The export interval and history must be at least 1.")
+        self.serialize = serialize
+        self.export_dir = export_dir
+        self.simulation_executor = simulation_executor
+        self.mode = mode
+        self.interval = interval
+        self.change_threshold = change_threshold
+        self.history = history
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plan-export')
+        # Guards the export state below, exports are requested from the asyncio loop and the simulation thread
+        self.lock = threading.Lock()
+        self.exporting = False
+        self.latest_plan = None
+        # Fingerprints of the demand set in the latest plan and of the latest published result, they differ
+        # after a result was served from the simulation cache
+        self.plan_fingerprint = None
+        self.result_fingerprint = None
+        self.simulation_count = 0
+        # Counters
+        self.exports = 0
+        self.failed_exports = 0
+        self.skipped_exports = 0
+
+    def on_simulation(self, plan, changes, demand_count, fingerprint):
+        """
+        Account for a completed simulation and export its plan if the policy asks for it, must be called
+        on the simulation thread before the next simulation starts.
+
+        :param plan: The simulated plan.
+        :param changes: Dictionary with the number of 'added', 'updated' and 'removed' demands.
+        :param demand_count: The number of demands in the plan.
+        :param fingerprint: The fingerprint of the simulated demand set.
+        """
+        with self.lock:
+            self.latest_plan = plan
+            self.plan_fingerprint = fingerprint
+            self.result_fingerprint = fingerprint
+        self.simulation_count += 1
+        if self.mode == 'interval':
+            export = self.simulation_count % self.interval == 0
+        elif self.mode == 'on_change':
+            changed = changes['added'] + changes['updated'] + changes['removed']
+            export = changed > 0 and changed >= self.change_threshold * max(demand_count, 1)
+        else:
+            export = False
+        if export and self.start_export():
+            self.download(plan)
+
+    def on_cached_result(self, fingerprint):
+        """
+        Account for a result published from the simulation cache, the latest plan may hold other demands.
+
+        :param fingerprint: The fingerprint of the demand set of the published result.
+        """
+        with self.lock:
+            self.result_fingerprint = fingerprint
+
+    def is_plan_published(self):
+        # Must be called with the lock held, logs why the latest plan can not be exported
+        if self.latest_plan is None:
+            logging.info("No simulated plan to export yet.")
+            return False
+        if self.plan_fingerprint != self.result_fingerprint:
+            logging.info("The published results were served from the simulation cache, the plan holds the "
+                         "demands of another simulation, skipping the export.")
+            return False
+        return True
+
+    def request_export(self):
+        """
+        Export the most recently simulated plan once the running simulation, if any, has completed.
+
+        :return: True if the export was started.
+        """
+        if self.mode == 'disabled':
+            logging.info("Plan export is disabled.")
+            return False
+        with self.lock:
+            if not self.is_plan_published():
+                self.skipped_exports += 1
+                return False
+        if not self.start_export():
+            return False
+        self.simulation_executor.submit(self.download_latest)
+        return True
+
+    def start_export(self):
+        # Skip the export if the previous one is still running rather than queueing plan downloads
+        with self.lock:
+            if self.exporting:
+                self.skipped_exports += 1
+                logging.info("Plan export still running, skipping this export.")
+                return False
+            self.exporting = True
+            return True
+
+    def download_latest(self):
+        # Runs on the simulation thread, the latest plan or result can be replaced by a simulation queued before it
+        with self.lock:
+            if not self.is_plan_published():
+                self.skipped_exports += 1
+                self.exporting = False
+                return
+            plan = self.latest_plan
+        self.download(plan)
+
+    def download(self, plan):
+        """
+        Serialize the plan on the simulation thread and hand the bytes to the export thread.
+
+        :param plan: The plan to export.
+        """
+        try:
+            plan_bytes = self.serialize(plan)
+        except Exception as err:
+            logging.error(f"Could not download the plan file: {err}")
+            self.finish_export(False)
+            return
+        self.executor.submit(self.export, plan_bytes)
+
+    def export(self, plan_bytes):
+        """
+        Write the plan to a new time stamped file in the export directory and drop the oldest files.
+
+        :param plan_bytes: The serialized plan.
+        :return: The path of the exported plan file, or None if the export failed.
+        """
+        try:
+            os.makedirs(self.export_dir, exist_ok=True)
+            file_name = f"plan_out-{datetime.now().strftime('%Y-%m-%d-%H%M%S-%f')}.pln"
+            file_path = os.path.join(self.export_dir, file_name)
+            # Write to a temporary file first so readers never see a partial plan
+            with open(file_path + '.tmp', 'wb') as file:
+                file.write(plan_bytes)
+            os.replace(file_path + '.tmp', file_path)
+            logging.info(f"Exported plan file {file_path}.")
+            self.rotate()
+        except Exception as err:
+            logging.error(f"Could not export the plan file: {err}")
+            self.finish_export(False)
+            return None
+        self.finish_export(True)
+        return file_path
+
+    def finish_export(self, exported):
+        with self.lock:
+            if exported:
+                self.exports += 1
+            else:
+                self.failed_exports += 1
+            self.exporting = False
+
+    def rotate(self):
+        # The time stamped names sort in export order
+        plan_files = sorted(file_name for file_name in os.listdir(self.export_dir)
+                            if file_name.startswith('plan_out-') and file_name.endswith('.pln'))
+        for file_name in plan_files[:-self.history]:
+            try:
+                os.remove(os.path.join(self.export_dir, file_name))
+            except OSError as err:
+                logging.info(f"Could not remove old plan file {file_name}: {err}")
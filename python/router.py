@@ -30,6 +30,8 @@ class Router:
         self.locator_intf = {}
         self.neighbors = []
         self.latest_time_stamp = None
+        self.changed_locators = set()
+        self.fresh_intf_locators = set()
 
     def set_locator(self, locator):
         """
@@ -58,6 +60,10 @@ class Router:
         :param locator_addr: The address of the locator.
         :param moving_average_gbps: The moving average in Gbps.
         """
+        # Track locators whose rate changed so the traffic matrix can be updated incrementally
+        if self.locator_intf.get(intf_name, {}).get(locator_addr, {}).get('rate') != moving_average:
+            self.changed_locators.add(locator_addr)
+        self.fresh_intf_locators.add((intf_name, locator_addr))
 
         try:
             self.locator_intf[intf_name][locator_addr] = {'rate': moving_average, 'time_stamp': time_stamp}
@@ -101,8 +107,63 @@ class Router:
         }
         self.neighbors.append(neighbor_entry)
 
+    def remove_intf_locator(self, intf_name, locator_addr):
+        """
+        Remove a locator from an interface, e.g. when its counter series is no longer valid.
+
+        :param intf_name: The name of the interface.
+        :param locator_addr: The address of the locator.
+        """
+        if locator_addr in self.locator_intf.get(intf_name, {}):
+            del self.locator_intf[intf_name][locator_addr]
+            if not self.locator_intf[intf_name]:
+                del self.locator_intf[intf_name]
+            self.changed_locators.add(locator_addr)
+        self.fresh_intf_locators.discard((intf_name, locator_addr))
+
+    def pop_changed_locators(self):
+        """
+        Return the locator addresses whose rate changed since the last call and reset the tracking.
+
+        :return: A set of locator addresses.
+        """
+        changed_locators = self.changed_locators
+        self.changed_locators = set()
+        return changed_locators
+
+    def sweep_intf_locator(self):
+        """
+        Remove the locators in 'locator_intf' that have not been updated since the last sweep.
+        """
+        for intf_name in list(self.locator_intf.keys()):
+            for locator_addr in list(self.locator_intf[intf_name].keys()):
+                if (intf_name, locator_addr) not in self.fresh_intf_locators:
+                    del self.locator_intf[intf_name][locator_addr]
+                    self.changed_locators.add(locator_addr)
+            if not self.locator_intf[intf_name]:
+                del self.locator_intf[intf_name]
+        self.fresh_intf_locators = set()
+
+    def expire_intf_locator(self, oldest_time_stamp):
+        """
+        Remove the locators in 'locator_intf' whose latest sample is older than a time stamp.
+
+        :param oldest_time_stamp: The time stamp of the oldest sample to keep.
+        """
+        for intf_name in list(self.locator_intf.keys()):
+            for locator_addr, locator_data in list(self.locator_intf[intf_name].items()):
+                if locator_data['time_stamp'] < oldest_time_stamp:
+                    del self.locator_intf[intf_name][locator_addr]
+                    self.changed_locators.add(locator_addr)
+                    self.fresh_intf_locators.discard((intf_name, locator_addr))
+            if not self.locator_intf[intf_name]:
+                del self.locator_intf[intf_name]
+
     def del_intf_locator(self):
         """
         Reset the 'locator_intf' dictionary.
         """
-        self.locator_intf = {}
\ No newline at end of file
+        for intf in self.locator_intf.values():
+            self.changed_locators.update(intf.keys())
+        self.locator_intf = {}
+        self.fresh_intf_locators = set()
\ No newline at end of file
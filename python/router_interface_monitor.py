@@ -17,126 +17,315 @@ or implied.
 
 """
 
-from collections import deque
+from array import array
+import heapq
 import logging
+from python import errors
+
+DATA_POINTS = 5  # Default number of data points in the moving average window
+RATE_UNIT = 'Mbps'  # Default unit of the moving average
+RATE_UNITS = {'bps': 1, 'Kbps': 10 ** 3, 'Mbps': 10 ** 6, 'Gbps': 10 ** 9}
+COUNTER_MODULUS = 2 ** 64  # Byte counters are unsigned 64-bit and wrap to 0
+MAX_COUNTER_RATE = 10 ** 12  # Highest plausible rate in bps, a wrap implying more is treated as a device reload
+EXPIRY_BUCKET_SECONDS = 30  # Width of the last-update time buckets used to expire series
+GROWTH_CHUNK = 1024  # Number of series slots added when the storage arrays are full
 
 
 class RouterInterfaceMonitor:
-    def __init__(self):
-        # Dictionary to store data for each interface
-        self.data_store = {}
+    def __init__(self, window_size=DATA_POINTS, rate_unit=RATE_UNIT):
+        """
+        Initialize the monitor.
+
+        :param window_size: The number of data points in the moving average window, at least 2.
+        :param rate_unit: The unit of the moving average, one of RATE_UNITS.
+        """
+        if not 2 <= window_size <= 256:
+            raise errors.InputError(window_size, "The moving average window must hold between 2 and 256 data points.")
+        if rate_unit not in RATE_UNITS:
+            raise errors.InputError(rate_unit, f"The rate unit must be one of {', '.join(RATE_UNITS)}.")
+        # The window holds window_size data points, i.e. window_size - 1 differences between them
+        self.window_slots = window_size - 1
+        self.rate_divisor = RATE_UNITS[rate_unit]
+        # Storage for the series data
+        self.del_all_data()
         # Attribute to store the latest time stamp
         self.latest_time_stamp = None
+        # Number of counter wraps and counter resets detected
+        self.counter_wraps = 0
+        self.counter_resets = 0
+        # Number of series removed by the last and all calls to remove_outdated_entries
+        self.last_evicted_series = 0
+        self.evicted_series = 0
+
+    def grow_storage(self):
+        # Add GROWTH_CHUNK zeroed series slots to the storage arrays
+        for series_array, slots in ((self.delta_times, self.window_slots), (self.delta_bytes, self.window_slots),
+                                    (self.ring_start, 1), (self.ring_length, 1), (self.window_times, 1),
+                                    (self.window_bytes, 1), (self.has_data_point, 1), (self.last_time_stamps, 1),
+                                    (self.last_byte_counts, 1), (self.moving_averages, 1),
+                                    (self.created_time_stamps, 1), (self.series_buckets, 1),
+                                    (self.series_interfaces, 1), (self.series_locators, 1)):
+            series_array.frombytes(bytes(series_array.itemsize * slots * GROWTH_CHUNK))
+        self.free_series_ids.extend(range(self.series_capacity + GROWTH_CHUNK - 1, self.series_capacity - 1, -1))
+        self.series_capacity += GROWTH_CHUNK
+
+    def find_series(self, router_id, interface_id, locator_addr):
+        # Return the id of a series, or -1 if it does not exist
+        interfaces = self.interface_ids.get(router_id)
+        if interfaces is None:
+            return -1
+        interface_key = interfaces.get(interface_id)
+        locator_key = self.locator_ids.get(locator_addr)
+        if interface_key is None or locator_key is None:
+            return -1
+        slots = self.interface_series[interface_key]
+        return slots[locator_key] if locator_key < len(slots) else -1
+
+    def add_series(self, router_id, interface_id, locator_addr, time_stamp):
+        # Allocate a series id for a new (router_id, interface_id, locator_addr) series
+        if not self.free_series_ids:
+            self.grow_storage()
+        series_id = self.free_series_ids.pop()
+        interfaces = self.interface_ids.setdefault(router_id, {})
+        interface_key = interfaces.get(interface_id)
+        if interface_key is None:
+            interface_key = interfaces[interface_id] = len(self.interface_series)
+            self.interface_series.append(array('i'))
+        locator_key = self.locator_ids.get(locator_addr)
+        if locator_key is None:
+            locator_key = self.locator_ids[locator_addr] = len(self.locator_addrs)
+            self.locator_addrs.append(locator_addr)
+        slots = self.interface_series[interface_key]
+        if locator_key >= len(slots):
+            slots.extend(array('i', [-1]) * (len(self.locator_addrs) - len(slots)))
+        slots[locator_key] = series_id
+        self.series_interfaces[series_id] = interface_key
+        self.series_locators[series_id] = locator_key
+        self.locator_counts[locator_addr] = self.locator_counts.get(locator_addr, 0) + 1
+        self.ring_start[series_id] = 0
+        self.ring_length[series_id] = 0
+        self.window_times[series_id] = 0
+        self.window_bytes[series_id] = 0
+        self.has_data_point[series_id] = 0
+        self.moving_averages[series_id] = 0
+        self.created_time_stamps[series_id] = time_stamp
+        self.series_buckets[series_id] = -1
+        return series_id
+
+    def remove_series(self, series_id):
+        # Release the id of a series so it can be reused, the interface and locator keys are kept
+        locator_key = self.series_locators[series_id]
+        self.interface_series[self.series_interfaces[series_id]][locator_key] = -1
+        locator_addr = self.locator_addrs[locator_key]
+        self.locator_counts[locator_addr] -= 1
+        if self.locator_counts[locator_addr] == 0:
+            del self.locator_counts[locator_addr]
+        self.move_series_bucket(series_id, -1)
+        self.free_series_ids.append(series_id)
+
+    def move_series_bucket(self, series_id, bucket):
+        # Move a series to the expiry bucket of its last update, -1 takes it out of the buckets. A series
+        # leaving a bucket stays in its id array and is skipped on expiry, the array is compacted once
+        # most of its ids have left
+        old_bucket = self.series_buckets[series_id]
+        self.series_buckets[series_id] = bucket
+        if old_bucket >= 0:
+            count = self.bucket_counts[old_bucket] - 1
+            if count == 0:
+                del self.bucket_counts[old_bucket]
+                del self.expiry_buckets[old_bucket]
+            else:
+                series_ids = self.expiry_buckets[old_bucket]
+                if len(series_ids) > 4 * count:
+                    series_ids = array('i', [bucket_series_id for bucket_series_id in series_ids
+                                             if self.series_buckets[bucket_series_id] == old_bucket])
+                    self.expiry_buckets[old_bucket] = series_ids
+                    count = len(series_ids)
+                self.bucket_counts[old_bucket] = count
+        if bucket >= 0:
+            if bucket not in self.expiry_buckets:
+                self.expiry_buckets[bucket] = array('i')
+                self.bucket_counts[bucket] = 0
+                heapq.heappush(self.bucket_heap, bucket)
+            self.expiry_buckets[bucket].append(series_id)
+            self.bucket_counts[bucket] += 1
 
     def get_moving_average(self, router_id, interface_id, locator_addr):
         # Retrieve the moving average for a specific router interface and locator address
-        key = (router_id, interface_id, locator_addr)
-        if key in self.data_store:
-            return self.data_store[key]['moving_average']
+        series_id = self.find_series(router_id, interface_id, locator_addr)
+        if series_id >= 0:
+            return self.moving_averages[series_id]
         else:
             return None
 
-
     def update_data(self, router_id, interface_id, locator_addr, new_byte_count, time_stamp):
         good_data = True
-        # Ensure the router_id entry exists
-        if router_id not in self.data_store:
-            self.data_store[router_id] = {}
-
-        # Ensure the interface_id entry exists
-        if interface_id not in self.data_store[router_id]:
-            self.data_store[router_id][interface_id] = {}
-
-        # Ensure the locator_addr entry exists
-        if locator_addr not in self.data_store[router_id][interface_id]:
-            self.data_store[router_id][interface_id][locator_addr] = {
-                'data_points': deque(maxlen=5),  # FIFO queue with a max size of 5
-                'moving_average': 0,
-                'time_stamp': time_stamp
-            }
-
-        # Get the existing data for the interface
-        interface_data = self.data_store[router_id][interface_id][locator_addr]
-
-        if len(interface_data['data_points']) > 0:
-            previous_byte_count = interface_data['data_points'][-1][1]
-        else:
-            previous_byte_count = 0
-        # Add new data point
-        if new_byte_count < previous_byte_count:
-            logging.info(
-                f"Bad data-point: {router_id}, {interface_id}, {locator_addr}, Byte count: {new_byte_count}, Time stamp: {time_stamp}, Previous byte count: {interface_data['data_points'][-1]}")
-            interface_data['data_points'].clear()
-            good_data = False
-
-        interface_data['data_points'].append((time_stamp, new_byte_count))
-
+        # Ensure the series exists
+        # The lookup of find_series, inlined on the per-sample path
+        series_id = -1
+        interfaces = self.interface_ids.get(router_id)
+        if interfaces is not None:
+            interface_key = interfaces.get(interface_id)
+            locator_key = self.locator_ids.get(locator_addr)
+            if interface_key is not None and locator_key is not None:
+                slots = self.interface_series[interface_key]
+                if locator_key < len(slots):
+                    series_id = slots[locator_key]
+        if series_id < 0:
+            series_id = self.add_series(router_id, interface_id, locator_addr, time_stamp)
+        new_byte_count = int(new_byte_count)
         # Update the latest time stamp
         self.latest_time_stamp = time_stamp
+        bucket = time_stamp // EXPIRY_BUCKET_SECONDS
+        if self.series_buckets[series_id] != bucket:
+            self.move_series_bucket(series_id, bucket)
 
-        # Calculate moving average in bps
-        if len(interface_data['data_points']) > 1:
-            # Calculate differences between consecutive data points
-            differences = [(t2 - t1, b2 - b1) for (t1, b1), (t2, b2) in
-                           zip(interface_data['data_points'], list(interface_data['data_points'])[1:])]
-            # Calculate the average rate
-            total_bytes = sum(diff[1] for diff in differences)
-            total_time = sum(diff[0] for diff in differences)
-            if total_time > 0:
-                interface_data['moving_average'] = int(
-                    ((total_bytes * 8) / total_time) / 10 ** 6) # Convert bytes to bits and compute rate
+        if not self.has_data_point[series_id]:
+            self.has_data_point[series_id] = 1
+            self.last_time_stamps[series_id] = time_stamp
+            self.last_byte_counts[series_id] = new_byte_count
+            return good_data, self.moving_averages[series_id]
+        previous_time_stamp = self.last_time_stamps[series_id]
+        previous_byte_count = self.last_byte_counts[series_id]
+        self.last_time_stamps[series_id] = time_stamp
+        self.last_byte_counts[series_id] = new_byte_count
+
+        time_delta = time_stamp - previous_time_stamp
+        byte_delta = new_byte_count - previous_byte_count
+        if byte_delta < 0:
+            # A counter that went backwards either wrapped or was reset by a device reload, a wrap is only
+            # plausible if the bytes since the previous data point fit in the time elapsed
+            byte_delta += COUNTER_MODULUS
+            if time_delta > 0 and (byte_delta * 8) / time_delta <= MAX_COUNTER_RATE:
+                self.counter_wraps += 1
+                logging.info(f"Counter wrap: {router_id}, {interface_id}, {locator_addr}")
             else:
-                interface_data['moving_average'] = 0
+                self.counter_resets += 1
+                logging.info(
+                    f"Bad data-point: {router_id}, {interface_id}, {locator_addr}, Byte count: {new_byte_count}, Time stamp: {time_stamp}, Previous byte count: {(previous_time_stamp, previous_byte_count)}")
+                # Invalidate the series only, its window restarts from the new data point
+                self.ring_start[series_id] = 0
+                self.ring_length[series_id] = 0
+                self.window_times[series_id] = 0
+                self.window_bytes[series_id] = 0
+                self.moving_averages[series_id] = 0
+                return False, 0
+
+        # Keep the differences between consecutive data points in a ring buffer along with their running
+        # sums, the sums telescope to the difference between the first and last data point of the window
+        window_slots = self.window_slots
+        length = self.ring_length[series_id]
+        if length < window_slots:
+            # The ring only starts to rotate once it is full, until then it fills from the start of the slots
+            position = series_id * window_slots + length
+            self.ring_length[series_id] = length + 1
+            total_time = self.window_times[series_id] + time_delta
+            total_bytes = self.window_bytes[series_id] + byte_delta
+        else:
+            start = self.ring_start[series_id]
+            position = series_id * window_slots + start
+            self.ring_start[series_id] = start + 1 if start + 1 < window_slots else 0
+            total_time = self.window_times[series_id] - self.delta_times[position] + time_delta
+            total_bytes = self.window_bytes[series_id] - self.delta_bytes[position] + byte_delta
+        self.delta_times[position] = time_delta
+        self.delta_bytes[position] = byte_delta
+        self.window_times[series_id] = total_time
+        self.window_bytes[series_id] = total_bytes
+
+        # Calculate moving average, converting bytes to bits
+        if total_time > 0:
+            moving_average = int(((total_bytes * 8) / total_time) / self.rate_divisor)
+        else:
+            moving_average = 0
+        self.moving_averages[series_id] = moving_average
         # logging.info(
-        #     f"Router: {router_id} Interface: {interface_id}, Locator: {locator_addr}  Moving Average: {interface_data['moving_average']} Mbps")
+        #     f"Router: {router_id} Interface: {interface_id}, Locator: {locator_addr}  Moving Average: {moving_average}")
 
-        return good_data, interface_data['moving_average']
+        return good_data, moving_average
 
-    #TODO this does not work to purge out-dated entries, need to debug
     def remove_outdated_entries(self, time_delta):
-        # Iterate through the data_store and remove entries with time_stamp older than the threshold
+        """
+        Remove the series not updated within time_delta seconds of the latest time stamp. Series are
+        expired a whole time bucket at a time, so a series may outlive time_delta by up to
+        EXPIRY_BUCKET_SECONDS, and the cost depends on the number of expired series only.
+
+        :param time_delta: The maximum age of a series in seconds.
+        :return: The number of series removed.
+        """
+        evicted_series = 0
         if self.latest_time_stamp is not None:
-            for router_id in list(self.data_store.keys()):
-                for interface_id in list(self.data_store[router_id].keys()):
-                    for locator_addr in list(self.data_store[router_id][interface_id].keys()):
-                        interface_data = self.data_store[router_id][interface_id][locator_addr]
-                        if interface_data['data_points'] and (
-                                self.latest_time_stamp - interface_data['data_points'][-1][0] > time_delta):
-                            del self.data_store[router_id][interface_id][locator_addr]
-                    if not self.data_store[router_id][interface_id]:
-                        del self.data_store[router_id][interface_id]
-                if not self.data_store[router_id]:
-                    del self.data_store[router_id]
+            cutoff = self.latest_time_stamp - time_delta
+            # Buckets ending at or before the cutoff only hold series older than time_delta
+            while self.bucket_heap and (self.bucket_heap[0] + 1) * EXPIRY_BUCKET_SECONDS <= cutoff:
+                bucket = heapq.heappop(self.bucket_heap)
+                self.bucket_counts.pop(bucket, None)
+                for series_id in self.expiry_buckets.pop(bucket, ()):
+                    # Skip the series that moved on to a later bucket
+                    if self.series_buckets[series_id] == bucket:
+                        self.series_buckets[series_id] = -1
+                        self.remove_series(series_id)
+                        evicted_series += 1
+        self.last_evicted_series = evicted_series
+        self.evicted_series += evicted_series
+        return evicted_series
 
     def get_unique_locator_addrs(self):
-        # Set to store unique locator addresses
-        unique_addrs = set()
-        # Traverse the nested dictionary to collect all unique locator addresses
-        for router_data in self.data_store.values():
-            for interface_data in router_data.values():
-                unique_addrs.update(interface_data.keys())
-        # Return the unique addresses as a list
-        return list(unique_addrs)
+        # Return the unique locator addresses as a list
+        return list(self.locator_counts.keys())
 
     def get_entries_by_router_id(self, router_id):
         # Method to get all entries for a given router_id
-        if router_id not in self.data_store:
+        if router_id not in self.interface_ids:
             return []
 
         entries = []
-        for interface_id, interfaces in self.data_store[router_id].items():
-            for locator_addr, data in interfaces.items():
+        for interface_id, interface_key in self.interface_ids[router_id].items():
+            for locator_key, series_id in enumerate(self.interface_series[interface_key]):
+                if series_id < 0:
+                    continue
                 entry = {
-                    'locator_addr': locator_addr,
+                    'locator_addr': self.locator_addrs[locator_key],
                     'interface_id': interface_id,
-                    'moving_average': data['moving_average'],
-                    'time_stamp': data['time_stamp']
+                    'moving_average': self.moving_averages[series_id],
+                    'time_stamp': self.created_time_stamps[series_id]
                 }
                 entries.append(entry)
         return entries
 
     def del_all_data(self):
         """
-        Reset the 'locator_intf' dictionary.
+        Reset the series storage.
         """
-        self.data_store = {}
+        # Each (router, interface, locator) series is interned to an integer id, the differences between its
+        # data points are kept in a fixed-size ring buffer at offset id * window_slots of the preallocated arrays.
+        # Nothing is stored per series outside the arrays: router interfaces and locator addresses get keys of
+        # their own, and every router interface has an array of its series ids indexed by locator key
+        self.series_capacity = 0
+        self.free_series_ids = array('i')
+        self.interface_ids = {}
+        self.interface_series = []
+        self.locator_ids = {}
+        self.locator_addrs = []
+        self.series_interfaces = array('i')
+        self.series_locators = array('i')
+        # Number of series per locator address
+        self.locator_counts = {}
+        self.delta_times = array('q')
+        self.delta_bytes = array('q')
+        self.ring_start = array('B')
+        self.ring_length = array('B')
+        # Running sums of the differences in the window
+        self.window_times = array('q')
+        self.window_bytes = array('q')
+        # Last data point of every series
+        self.has_data_point = array('B')
+        self.last_time_stamps = array('q')
+        self.last_byte_counts = array('Q')
+        self.moving_averages = array('q')
+        self.created_time_stamps = array('q')
+        # Series ids per time bucket of their last update with the number still in the bucket, the bucket of
+        # every series and a heap of the buckets
+        self.expiry_buckets = {}
+        self.bucket_counts = {}
+        self.series_buckets = array('q')
+        self.bucket_heap = []
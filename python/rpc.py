@@ -0,0 +1,115 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from python import errors
+
+RPC_TIMEOUT = 10  # Seconds a call may take before an error is returned
+RPC_EXECUTOR_WORKERS = 4  # Threads running blocking methods
+
+
+class RpcMethod:
+    __slots__ = ('handler', 'signature', 'blocking', 'timeout')
+
+    def __init__(self, handler, blocking, timeout):
+        self.handler = handler
+        self.signature = inspect.signature(handler)
+        self.blocking = blocking
+        self.timeout = timeout
+
+
+class RpcRegistry:
+    def __init__(self, timeout=RPC_TIMEOUT, executor_workers=RPC_EXECUTOR_WORKERS):
+        """
+        Dispatch JSON-RPC style requests, {"id": ..., "method": ..., "params": {...}}, to the methods
+        registered with it. Only registered methods can be called.
+
+        :param timeout: The default number of seconds a call may take.
+        :param executor_workers: The number of threads running blocking methods.
+        """
+        self.timeout = timeout
+        self.methods = {}
+        self.executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix='rpc')
+
+    def register(self, name, handler, blocking=False, timeout=None):
+        """
+        Make a method callable.
+
+        :param name: The method name used in requests.
+        :param handler: A coroutine function, or a function returning the result.
+        :param blocking: Run the function on the executor threads instead of the event loop.
+        :param timeout: The number of seconds a call may take, the registry default if None.
+        """
+        self.methods[name] = RpcMethod(handler, blocking, timeout if timeout is not None else self.timeout)
+
+    async def dispatch(self, message):
+        """
+        Call the method of a request.
+
+        :param message: The JSON encoded request.
+        :return: The JSON encoded reply, {"id": ..., "response": ..., "error": ...}.
+        """
+        request_id = None
+        try:
+            request = json.loads(message)
+            request_id = request.get('id')
+            method_name = request['method']
+            params = request.get('params') or {}
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return self.encode_reply(request_id, error="Invalid request")
+        if not isinstance(method_name, str) or not isinstance(params, (dict, list)):
+            return self.encode_reply(request_id, error="Invalid request")
+
+        method = self.methods.get(method_name)
+        if method is None:
+            return self.encode_reply(request_id, error=f"Unknown method {method_name}")
+        try:
+            if isinstance(params, dict):
+                bound = method.signature.bind(**params)
+            else:
+                bound = method.signature.bind(*params)
+        except TypeError as err:
+            return self.encode_reply(request_id, error=f"Invalid params: {err}")
+
+        try:
+            if inspect.iscoroutinefunction(method.handler):
+                call = method.handler(*bound.args, **bound.kwargs)
+            elif method.blocking:
+                call = asyncio.get_event_loop().run_in_executor(
+                    self.executor, functools.partial(method.handler, *bound.args, **bound.kwargs))
+            else:
+                return self.encode_reply(request_id, result=method.handler(*bound.args, **bound.kwargs))
+            result = await asyncio.wait_for(call, method.timeout)
+        except asyncio.TimeoutError:
+            return self.encode_reply(request_id, error=f"Method {method_name} timed out")
+        except errors.InputError as err:
+            # Bad arguments are the caller's error, only the explanation is returned
+            return self.encode_reply(request_id, error=f"Method {method_name} failed: {err.message}")
+        except Exception as err:
+            logging.error(f"RPC method {method_name} failed: {err}")
+            return self.encode_reply(request_id, error=f"Method {method_name} failed: {err}")
+        return self.encode_reply(request_id, result=result)
+
+    def encode_reply(self, request_id, result=None, error=None):
+        return json.dumps({"id": request_id, "response": result, "error": error}, separators=(",", ":"))
@@ -0,0 +1,98 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import hashlib
+from collections import OrderedDict
+from python import errors
+
+
+def get_demand_fingerprint(traffic_data, rate_bucket):
+    """
+    Compute a canonical fingerprint of a demand set. Rates are rounded to the nearest multiple of
+    rate_bucket, so demand sets that only differ by small rate changes share a fingerprint.
+
+    :param traffic_data: The traffic matrix entries.
+    :param rate_bucket: The rate quantization step, 0 compares exact rates.
+    :return: The fingerprint as a hex string.
+    """
+    demands = []
+    for entry in traffic_data:
+        rate = entry['traffic_rate']
+        if rate_bucket:
+            rate = round(rate / rate_bucket)
+        demands.append((entry['source_router'], entry['dest_router'], entry['locator_addr'], entry['algo_name'],
+                        rate))
+    # Sort so the fingerprint does not depend on the order of the entries
+    demands.sort()
+    return hashlib.sha256(repr(demands).encode()).hexdigest()
+
+
+class SimulationResultCache:
+    def __init__(self, max_entries, rate_bucket):
+        """
+        Initialize a least recently used cache of simulation results keyed by demand set fingerprint.
+
+        :param max_entries: The maximum number of cached results.
+        :param rate_bucket: The rate quantization step of the fingerprint, 0 compares exact rates.
+        """
+        if max_entries < 1:
+            raise errors.InputError("max_entries", "The simulation cache must hold at least one result.")
+        if rate_bucket < 0:
+            raise errors.InputError("rate_bucket", "The rate bucket can not be negative.")
+        self.max_entries = max_entries
+        self.rate_bucket = rate_bucket
+        self.results = OrderedDict()
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_fingerprint(self, traffic_data):
+        return get_demand_fingerprint(traffic_data, self.rate_bucket)
+
+    def get(self, fingerprint):
+        """
+        Look up the result of a demand set.
+
+        :param fingerprint: The fingerprint of the demand set.
+        :return: The cached result, or None on a miss.
+        """
+        result = self.results.get(fingerprint)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(fingerprint)
+        return result
+
+    def put(self, fingerprint, result):
+        """
+        Cache the result of a demand set, evicting the least recently used result if the cache is full.
+
+        :param fingerprint: The fingerprint of the demand set.
+        :param result: The simulation result.
+        """
+        self.results[fingerprint] = result
+        self.results.move_to_end(fingerprint)
+        while len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.results.clear()
@@ -0,0 +1,88 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LatestOnlySimulationRunner:
+    def __init__(self, simulate, on_result, executor=None):
+        """
+        Run blocking simulations on a dedicated worker thread, off the asyncio loop. Only one simulation
+        runs at a time and at most one traffic matrix waits for it; a newer matrix replaces the waiting one.
+
+        :param simulate: Blocking function of the traffic data returning the simulation result, or None
+                         if the simulation failed.
+        :param on_result: Function of (traffic_data, result) called on the asyncio loop for every result.
+        :param executor: Single worker executor running the simulations, shared with other work that must
+                         not overlap a simulation. A new one is created if not given.
+        """
+        self.simulate = simulate
+        self.on_result = on_result
+        # A single worker keeps every call to the planning server on the same thread
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='simulation')
+        self.executor = executor
+        self.pending_traffic_data = None
+        self.running = False
+        # Counters
+        self.completed_simulations = 0
+        self.failed_simulations = 0
+        self.superseded_simulations = 0
+
+    def submit(self, traffic_data):
+        """
+        Queue a traffic matrix for simulation, must be called from the asyncio loop.
+
+        :param traffic_data: The traffic matrix entries, not modified after they are submitted.
+        """
+        if self.pending_traffic_data is not None:
+            self.superseded_simulations += 1
+            logging.info("Simulation still running, replacing the waiting traffic matrix with the latest one.")
+        self.pending_traffic_data = traffic_data
+        if not self.running:
+            self.running = True
+            asyncio.ensure_future(self.run())
+
+    async def run(self):
+        # Simulate waiting traffic matrices until none is left
+        loop = asyncio.get_event_loop()
+        try:
+            while self.pending_traffic_data is not None:
+                traffic_data = self.pending_traffic_data
+                self.pending_traffic_data = None
+                try:
+                    result = await loop.run_in_executor(self.executor, self.simulate, traffic_data)
+                except Exception as err:
+                    self.failed_simulations += 1
+                    logging.error(f"Simulation failed: {err}")
+                    continue
+                if result is None:
+                    # An empty result would clear the published interface data
+                    self.failed_simulations += 1
+                    logging.info("Simulation failed, keeping the previous results.")
+                    continue
+                self.completed_simulations += 1
+                try:
+                    self.on_result(traffic_data, result)
+                except Exception as err:
+                    logging.error(f"Could not publish simulation results: {err}")
+        finally:
+            self.running = False
@@ -0,0 +1,53 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+
+Snapshot = namedtuple('Snapshot', ['body', 'etag'])
+
+
+class SnapshotStore:
+    def __init__(self):
+        """
+        Keep the latest version of named documents, e.g. the traffic matrix, encoded once when they are
+        stored so they can be served any number of times without encoding or reading them from disk.
+        """
+        # name -> Snapshot, snapshots are replaced, never modified, so other threads can read them at any time
+        self.snapshots = {}
+
+    def put(self, name, document):
+        """
+        Store the latest version of a document.
+
+        :param name: The name of the document.
+        :param document: The document, encoded as JSON before this returns.
+        """
+        body = json.dumps(document, separators=(',', ':')).encode()
+        self.snapshots[name] = Snapshot(body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+    def get(self, name):
+        """
+        Get the latest version of a document.
+
+        :param name: The name of the document.
+        :return: The Snapshot, or None if the document was never stored.
+        """
+        return self.snapshots.get(name)
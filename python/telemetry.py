@@ -19,17 +19,63 @@ or implied.
 import asyncio
 import json
 import logging
+import re
 from python import router
 from python import router_interface_monitor
 from python import traffic_matrix
 from python import utils
 from python import crosswork_planning
-import dateutil
+from python import traffic_matrix_engine
+from python import topology
+from python import influx
+from python import simulation_runner
+from python import delta_channel
+from python import snapshot_store
+
+# Influx polling settings
+INFLUX_QUERY_CONCURRENCY = 10  # Maximum number of in-flight Influx queries per cycle
+INFLUX_QUERY_TIMEOUT = 10  # Per-request timeout in seconds
+INFLUX_QUERY_RETRIES = 2  # Additional attempts for a failed query
+INFLUX_QUERY_RETRY_DELAY = 1  # Seconds to wait between attempts
+INFLUX_BATCH_QUERY = True  # Query all routers with one regex-matched query per chunk instead of one per router
+INFLUX_BATCH_SIZE = 100  # Maximum number of routers matched by a single batched query
+INFLUX_EPOCH = 's'  # Request epoch time stamps from Influx ('s', 'ms', 'u' or 'ns'), None for RFC 3339 strings
+INFLUX_EPOCH_DIVISORS = {'s': 1, 'ms': 10 ** 3, 'u': 10 ** 6, 'ns': 10 ** 9}
+INFLUX_CHUNKED = True  # Stream query responses in chunks and decode them as they arrive
+INFLUX_CHUNK_SIZE = 10000  # Maximum number of points per response chunk
+INFLUX_WRITE_BATCH_BYTES = 1024 * 1024  # Maximum size of a single line protocol write
+INFLUX_WRITE_GZIP = False  # Compress line protocol writes
+INFLUX_WRITE_MAX_PENDING = 16  # Maximum number of queued write batches before the oldest are dropped
+
+# Streaming ingestion settings
+STREAM_COMPUTE_INTERVAL = 10  # Seconds between traffic matrix computations when streaming
+STREAM_RATE_MAX_AGE = 90  # Drop streamed rates whose latest sample is older than this (s), a few sensor intervals
+
+# Traffic matrix settings
+TRAFFIC_MATRIX_ENGINE = 'incremental'  # 'incremental' recomputes only changed rows, 'vectorized' rebuilds with
+                                       # numpy array operations, 'full' rebuilds locator by locator
+EXTERNAL_TRAFFIC_THRESHOLD = 5000  # Ignore demands with less external traffic than this (Mbps)
+SERIES_EXPIRY_SECONDS = 300  # Drop locator counter series not updated for this long
+
+LOCATOR_ENCODING_PATH = "Cisco-IOS-XR-fib-common-oper:cef-accounting/vrfs/vrf/afis/afi/pfx/srv6locs/srv6loc"
+LOCATOR_BYTES_FIELD = "accounting_information/number_of_tx_bytes"
 
 # Globals
 monitor = router_interface_monitor.RouterInterfaceMonitor()
 router_dict = {}
 local_traffic_matrix = traffic_matrix.TrafficMatrix()
+matrix_engine = None
+influx_writer = None
+stream_task = None
+simulation_worker = None
+# Rows published to the web clients, traffic rows keyed by demand name, interface rows by (router, interface)
+traffic_channel = delta_channel.DeltaChannel('traffic')
+interface_channel = delta_channel.DeltaChannel('interface')
+# Latest traffic matrix and interface data, served over HTTP
+snapshots = snapshot_store.SnapshotStore()
+snapshots.put('traffic_matrix', [])
+snapshots.put('interface_data', {})
+stream_bad_data_count = 0
 
 with open('jsonfiles/node_neighbors.json', 'r') as file:
     file_dict = json.load(file)
@@ -44,124 +90,297 @@ for router_id, attributes in file_dict.items():
     for neighbor in attributes['neighbors']:
         tmp_router.add_neighbor(neighbor['hostname'], neighbor['intf_name'])
     router_dict[router_id] = tmp_router
+# Build the locator, SID and display name lookups once
+topology_index = topology.TopologyIndex(file_dict, sid_map, node_names)
 
 
-async def traffic_matrix_updater(websockets):
+async def traffic_matrix_updater(broadcast_hub, stream_source=None):
+    """
+    Collect locator counters, then compute and publish the traffic matrix.
+
+    :param broadcast_hub: The BroadcastHub publishing results to the open websockets.
+    :param stream_source: Optional async iterator of telegraf metrics, when set the counters are
+                          consumed from the stream instead of polling Influx.
+    """
     global router_dict
     global local_traffic_matrix
     global monitor
+    global stream_task
+    global stream_bad_data_count
+    global matrix_engine
+    global influx_writer
+    global simulation_worker
 
     # Define the base URL and parameters
     influx_query_url = 'http://10.135.7.178:8086/query'
     influx_write_url = 'http://10.135.7.178:8086/write?db=telegraf'
     with open('templates/query_template.txt', 'r') as file:
         query_template = file.read().strip()
-    with open('templates/write_template.txt', 'r') as file:
-        write_template = file.read().strip()
-    count = 0
+    with open('templates/query_batch_template.txt', 'r') as file:
+        batch_query_template = file.read().strip()
+    with open('templates/export_schema.json', 'r') as file:
+        export_schema = json.load(file)
+    if matrix_engine is None:
+        if TRAFFIC_MATRIX_ENGINE == 'vectorized':
+            matrix_engine = traffic_matrix_engine.VectorizedTrafficMatrixEngine(router_dict, build_traffic_entry,
+                                                                                EXTERNAL_TRAFFIC_THRESHOLD)
+        else:
+            matrix_engine = traffic_matrix_engine.IncrementalTrafficMatrixEngine(router_dict, build_traffic_entry,
+                                                                                 EXTERNAL_TRAFFIC_THRESHOLD)
+    if influx_writer is None:
+        influx_writer = influx.InfluxLineWriter(influx_write_url, precision='s',
+                                                max_batch_bytes=INFLUX_WRITE_BATCH_BYTES, use_gzip=INFLUX_WRITE_GZIP,
+                                                max_pending_batches=INFLUX_WRITE_MAX_PENDING)
+    influx_writer.start()
+    if simulation_worker is None:
+        simulation_worker = simulation_runner.LatestOnlySimulationRunner(
+            crosswork_planning.run_simulation,
+            lambda traffic_data, intf_data: publish_interface_data(broadcast_hub, export_schema, intf_data),
+            executor=crosswork_planning.simulation_executor)
+    if stream_source is not None and (stream_task is None or stream_task.done()):
+        stream_task = asyncio.ensure_future(consume_locator_stream(stream_source))
     good_collection_count = 0
     while True:
         bad_data_count = 0
         logging.info("Traffic matrix updater thread is running...")
-        await asyncio.sleep(30)
-        # query the influxdb for locator counters
-        for router, attributes in router_dict.items():
-            query_formatted = query_template.format(hostname=router)
-            params = {
-                'pretty': 'true',
-                'db': 'telegraf',
-                'q': query_formatted
-            }
-            response = await utils.rest_get_tornado_httpclient(influx_query_url, data=params)
-            try:
-                response_dict = json.loads(response)
-            except Exception as err:
-                pass
-            try:
-                for data_point in response_dict['results'][0]['series']:
-                    # logging.info(
-                    #     f"{router}, {data_point['tags']['accounting_information/outgoing_interface']}, {data_point['tags']['ipv6_address']}, time-stamp: {data_point['values'][0][0]} bytes: {data_point['values'][0][1]}")
-                    good_data = process_influx_locator(data_point)
-                    if not good_data:
-                        bad_data_count += 1
-                        good_collection_count = 0
-                        monitor.del_all_data()
-                        logging.info("Bad data detected, will not process traffic matrix.")
-            except Exception as err:
-                logging.info(f"Could not get data for {router}")
+        if stream_source is not None:
+            # counters arrive continuously from the stream, only pick up bad data seen since the last pass
+            await asyncio.sleep(STREAM_COMPUTE_INTERVAL)
+            bad_data_count = stream_bad_data_count
+            stream_bad_data_count = 0
+            # sensors report on their own cadence, which can be longer than the compute interval, so rates
+            # are kept until they are too old relative to the newest sample rather than swept every pass
+            expire_stream_rates()
+        else:
+            await asyncio.sleep(30)
+            # query the influxdb for locator counters, the series are processed in router_dict order as they
+            # are decoded, only those of queries finishing ahead of their turn are held in memory
+            series_counts = {router: 0 for router in router_dict.keys()}
+
+            def ingest_series(data_point):
+                nonlocal bad_data_count
+                if not ingest_influx_series(data_point, series_counts):
+                    bad_data_count += 1
+
+            if INFLUX_BATCH_QUERY:
+                await query_influx_batched(influx_query_url, batch_query_template, ingest_series)
+            else:
+                await query_influx_routers(influx_query_url, query_template, ingest_series)
+            for router, series_count in series_counts.items():
+                if series_count == 0:
+                    logging.info(f"Could not get data for {router}")
 
-        if bad_data_count == 0:
-            good_collection_count += 1
-            logging.info(f"Good collection cycles completed: {good_collection_count}")
+        # counter resets only invalidate their own series, the rest of the network is still processed
+        if bad_data_count > 0:
+            logging.info(f"Bad data detected, {bad_data_count} series restarted.")
+        good_collection_count += 1
+        logging.info(f"Good collection cycles completed: {good_collection_count}")
+
+        # clear out series in the traffic monitor that have not been updated recently
+        evicted_series = monitor.remove_outdated_entries(SERIES_EXPIRY_SECONDS)
+        if evicted_series > 0:
+            logging.info(f"Purged {evicted_series} outdated series from traffic monitor, "
+                         f"{monitor.evicted_series} in total.")
 
         # if multiple good collections, compute the traffic matrix
         if good_collection_count >= 3:
             # compute new trafic matrix
-            local_traffic_matrix = traffic_matrix.TrafficMatrix()
-            for locator_addr in monitor.get_unique_locator_addrs():
-                update_traffic_matrix(locator_addr)
-            traffic_data = local_traffic_matrix.get_traffic_entries()
-            cleaned_traffic_data = []
-            for record in traffic_data:
+            if TRAFFIC_MATRIX_ENGINE == 'incremental':
+                matrix_changes = matrix_engine.compute()
+                local_traffic_matrix = matrix_engine.traffic_matrix
+                logging.info(f"Traffic matrix updated: {len(matrix_changes['added'])} added, "
+                             f"{len(matrix_changes['updated'])} updated, {len(matrix_changes['removed'])} removed.")
+            elif TRAFFIC_MATRIX_ENGINE == 'vectorized':
+                local_traffic_matrix = matrix_engine.compute(monitor.get_unique_locator_addrs())
+            else:
+                # build the matrix aside, queries on the server thread must not see it half built
+                full_traffic_matrix = traffic_matrix.TrafficMatrix()
+                for locator_addr in monitor.get_unique_locator_addrs():
+                    update_traffic_matrix(full_traffic_matrix, locator_addr)
+                local_traffic_matrix = full_traffic_matrix
+            traffic_entries = local_traffic_matrix.get_traffic_entries()
+            traffic_rows = {}
+            for record in traffic_entries:
                 record_copy = record.copy()
                 record_copy.pop('locator_addr', None)
-                cleaned_traffic_data.append(record_copy)
-            # for entry in traffic_data:
-            #     entry['source_router'] = node_names[entry['source_router']]
-            #     entry['dest_router'] = node_names[entry['dest_router']]
-            message = {'target': 'traffic', 'data': cleaned_traffic_data}
-            message_json = json.dumps(message, indent=2, sort_keys=True)
-            # write to websocket updated traffic matrix
-            for ws in websockets:
-                ws.send_message(message_json)
-            # write the traffic matrix to a file
+                traffic_rows[record_copy['demand_name']] = record_copy
+            # write to websocket the changed rows of the traffic matrix
+            message_json = traffic_channel.update(traffic_rows)
+            if message_json is not None:
+                broadcast_hub.broadcast(message_json)
+            # keep the traffic matrix for the HTTP clients and write it to a file
+            snapshots.put('traffic_matrix', traffic_entries)
             with open('jsongets/traffic_matrix.json', 'w') as file:
-                json.dump(local_traffic_matrix.get_traffic_entries(), file, indent=4)
+                json.dump(traffic_entries, file, indent=4)
+
+            # queue the traffic matrix to be written to InfluxDB in batches
+            influx_writer.write(influx.format_schema_points(export_schema['demand'],
+                                                            traffic_entries,
+                                                            influx_writer.get_time_stamp()))
 
-            # Run simulation analysis through crosswork planning
+            # Run simulation analysis through crosswork planning on the simulation worker thread, the
+            # engine updates its entries in place so the worker gets copies
             logging.info("Running simulation analysis with Crosswork Planning...")
-            intf_data = crosswork_planning.run_simulation(local_traffic_matrix.get_traffic_entries())
-            message = {'target': 'interface', 'data': intf_data}
-            message_json = json.dumps(message, indent=2, sort_keys=True)
-            # write to websocket updated traffic matrix
-            for ws in websockets:
-                ws.send_message(message_json)
-            # write interface data to a file
-            with open('jsongets/interface_data.json', 'w') as file:
-                json.dump(intf_data, file, indent=4)
-
-            # write to InfluxDB
-            for router, router_attr in intf_data.items():
-                for intf, intf_attr in router_attr.items():
-                    write_data = write_template.format(router_id=router, intf_name=intf,
-                                                       wc_traffic=intf_attr['worst-case-traffic'])
-                    await utils.rest_post_tornado_httpclient(influx_write_url, data=write_data)
-
-            # clear interface data from all routers
-            for router, attributes in router_dict.items():
-                attributes.del_intf_locator()
-            count += 1
-            # periodically clear out entries in the traffic monitor older than 300 seconds
-            if count % 10 == 0:
-                logging.info("Purging outdated entries in traffic monitor...")
-                monitor.remove_outdated_entries(300)
+            simulation_worker.submit([entry.copy() for entry in traffic_entries])
+
+            if stream_source is None:
+                # clear interface data not refreshed by this poll from all routers
+                for router, attributes in router_dict.items():
+                    attributes.sweep_intf_locator()
+
+
+def publish_interface_data(broadcast_hub, export_schema, intf_data):
+    """
+    Publish the interface results of a simulation to the websockets, the file system and InfluxDB.
+
+    :param broadcast_hub: The BroadcastHub publishing results to the open websockets.
+    :param export_schema: The InfluxDB export schema.
+    :param intf_data: The interface results of the simulation.
+    """
+    interface_rows = {(router, intf): dict(intf_attr, router=router, interface=intf)
+                      for router, router_attr in intf_data.items()
+                      for intf, intf_attr in router_attr.items()}
+    # write to websocket the changed interface rows
+    message_json = interface_channel.update(interface_rows)
+    if message_json is not None:
+        broadcast_hub.broadcast(message_json)
+    # keep the interface data for the HTTP clients and write it to a file
+    snapshots.put('interface_data', intf_data)
+    with open('jsongets/interface_data.json', 'w') as file:
+        json.dump(intf_data, file, indent=4)
+    # queue the interface results to be written to InfluxDB in batches
+    influx_writer.write(influx.format_schema_points(export_schema['interface'], list(interface_rows.values()),
+                                                    influx_writer.get_time_stamp()))
+
+
+async def query_influx_routers(influx_query_url, query_template, series_callback):
+    # Fan out one query per router, bounded by INFLUX_QUERY_CONCURRENCY
+    queries = [(query_template.format(hostname=router), router) for router in router_dict.keys()]
+    await query_influx_ordered(influx_query_url, queries, series_callback)
+
+
+async def query_influx_batched(influx_query_url, batch_query_template, series_callback):
+    # Match chunks of INFLUX_BATCH_SIZE routers with a regex on the source tag
+    routers = list(router_dict.keys())
+    queries = []
+    for index in range(0, len(routers), INFLUX_BATCH_SIZE):
+        chunk = routers[index:index + INFLUX_BATCH_SIZE]
+        hostnames = '|'.join(re.escape(router).replace('/', '\\/') for router in chunk)
+        queries.append((batch_query_template.format(hostnames=hostnames), f"routers {chunk[0]}..{chunk[-1]}"))
+    await query_influx_ordered(influx_query_url, queries, series_callback)
+
+
+async def query_influx_ordered(influx_query_url, queries, series_callback):
+    # Run the (query, label) pairs concurrently, the series still reach series_callback in the order of the
+    # queries, i.e. router_dict order, so processing is deterministic
+    semaphore = asyncio.Semaphore(INFLUX_QUERY_CONCURRENCY)
+    delivery = influx.OrderedSeriesDelivery(len(queries), series_callback)
+
+    async def run_query(query_index, query, label):
+        try:
+            await query_influx(semaphore, influx_query_url, query, label,
+                               lambda series: delivery.deliver(query_index, series))
+        finally:
+            delivery.finish(query_index)
+
+    await asyncio.gather(*(run_query(query_index, query, label)
+                           for query_index, (query, label) in enumerate(queries)))
+
+
+async def query_influx(semaphore, influx_query_url, query, label, series_callback):
+    params = {
+        'db': 'telegraf',
+        'q': query
+    }
+    if INFLUX_EPOCH:
+        params['epoch'] = INFLUX_EPOCH
+    if INFLUX_CHUNKED:
+        params['chunked'] = 'true'
+        params['chunk_size'] = INFLUX_CHUNK_SIZE
+    series_count = 0
+
+    def count_series(series):
+        nonlocal series_count
+        series_count += 1
+        series_callback(series)
+
+    async with semaphore:
+        for attempt in range(INFLUX_QUERY_RETRIES + 1):
+            if INFLUX_CHUNKED:
+                # process the series chunk by chunk as the response body arrives
+                decoder = influx.InfluxChunkDecoder(count_series)
+                response = await utils.rest_get_tornado_httpclient_stream(influx_query_url, decoder.feed,
+                                                                          data=params,
+                                                                          request_timeout=INFLUX_QUERY_TIMEOUT)
+                decoder.close()
+                if response is None and decoder.error is None:
+                    break
+                response = response or decoder.error
+            else:
+                response = await utils.rest_get_tornado_httpclient(influx_query_url, data=params,
+                                                                   request_timeout=INFLUX_QUERY_TIMEOUT)
+                try:
+                    series_list = get_influx_series(json.loads(response))
+                except Exception as err:
+                    series_list = None
+                if series_list is not None:
+                    for series in series_list:
+                        count_series(series)
+                    break
+            logging.info(f"Influx query failed for {label} (attempt {attempt + 1}): {response}")
+            if series_count > 0:
+                # the samples received before the failure are already processed, a retry would repeat them
+                break
+            if attempt < INFLUX_QUERY_RETRIES:
+                await asyncio.sleep(INFLUX_QUERY_RETRY_DELAY)
+    return series_count
+
+
+def get_influx_series(response_dict):
+    # Collect the series from every statement result in an Influx response
+    series = []
+    try:
+        for result in response_dict['results']:
+            series.extend(result.get('series', []))
+    except Exception as err:
+        pass
+    return series
+
+
+async def consume_locator_stream(stream_source):
+    # Feed locator counters into the monitor as the stream delivers them
+    global stream_bad_data_count
+    try:
+        async for metric in stream_source:
+            good_data = process_telegraf_locator(metric)
+            if not good_data:
+                stream_bad_data_count += 1
+    except Exception as err:
+        logging.error(f"Telemetry stream stopped: {err}")
+    logging.info("Telemetry stream ended.")
+
+
+def ingest_influx_series(data_point, series_counts):
+    # Count the series of each router, then process its locator counter, returns False on bad data
+    try:
+        series_counts[data_point['tags']['source']] += 1
+    except KeyError:
+        logging.info("Received influx series for an unknown source.")
+        return True
+    return process_influx_locator(data_point)
 
 
 def process_influx_locator(data):
     good_data = True
-    telemetry_encoding_path = "Cisco-IOS-XR-fib-common-oper:cef-accounting/vrfs/vrf/afis/afi/pfx/srv6locs/srv6loc"
     try:
-        if data["name"] == telemetry_encoding_path and "tags" in data:
+        if data["name"] == LOCATOR_ENCODING_PATH and "tags" in data:
             try:
                 router_id = data['tags']['source']
                 if_name = data['tags']['accounting_information/outgoing_interface']
                 output_bytes = data['values'][0][1]
                 locator_addr = data['tags']['ipv6_address']
-                time_stamp = rfc3339_to_epoch(data['values'][0][0])
-                good_data, moving_average = monitor.update_data(router_id, if_name, locator_addr, output_bytes,
-                                                                time_stamp)
-                if good_data:
-                    router_dict[router_id].add_intf_locator(if_name, locator_addr, moving_average, time_stamp)
+                time_stamp = influx_time_to_epoch(data['values'][0][0])
+                good_data = ingest_locator_sample(router_id, if_name, locator_addr, output_bytes, time_stamp)
             except Exception as err:
                 logging.info(f"Exception processing influx data for {router}")
     except Exception as err:
@@ -169,39 +388,77 @@ def process_influx_locator(data):
     return good_data
 
 
-def update_traffic_matrix(locator_addr):
-    for router_id, router in router_dict.items():
-        router_total = router.sum_locators_for_address(locator_addr)
-        router_time_stamp = router.get_latest_time_stamp()
+def process_telegraf_locator(metric):
+    # Process a locator counter metric delivered by telegraf in json format
+    good_data = True
+    try:
+        if metric["name"] == LOCATOR_ENCODING_PATH:
+            try:
+                router_id = metric['tags']['source']
+                if_name = metric['tags']['accounting_information/outgoing_interface']
+                output_bytes = metric['fields'][LOCATOR_BYTES_FIELD]
+                locator_addr = metric['tags']['ipv6_address']
+                time_stamp = int(metric['timestamp'])
+                good_data = ingest_locator_sample(router_id, if_name, locator_addr, output_bytes, time_stamp)
+            except Exception as err:
+                logging.info(f"Exception processing telemetry stream data for {metric.get('tags')}")
+    except Exception as err:
+        logging.info("Invalid message from telemetry stream.")
+    return good_data
 
-        if router_total > 0:
-            neighbors_total = 0
-            # find all neighbors with locator and get traffic rate
-            for neighbor in router.neighbors:
-                neighbor_total = router_dict[neighbor['neighbor_id']].get_intf_locator(neighbor['remote_intf_name'],
-                                                                                       locator_addr)[0]
-                neighbors_total += neighbor_total
-            external_traffic = router_total - neighbors_total
-            if external_traffic >= 5000:  # Ignore anything less than 1000 Mbps
-                logging.info(f"Router {router_id} is the source of {external_traffic} Mbps to locator {locator_addr}.")
-                dest_router_id = node_names[get_router_id_from_locator(locator_addr)]
-                algo_name = sid_map[locator_addr][1]
-                demand_name = f"{node_names[router_id]}_{dest_router_id}_{algo_name}"
-                local_traffic_matrix.add_traffic_entry(node_names[router_id], dest_router_id, locator_addr, external_traffic, algo_name, demand_name)
+
+def expire_stream_rates():
+    # Sample time stamps are used rather than the clock, so replayed streams expire at their own pace
+    time_stamps = [attributes.get_latest_time_stamp() for attributes in router_dict.values()
+                   if attributes.get_latest_time_stamp() is not None]
+    if not time_stamps:
+        return
+    oldest_time_stamp = max(time_stamps) - STREAM_RATE_MAX_AGE
+    for router, attributes in router_dict.items():
+        attributes.expire_intf_locator(oldest_time_stamp)
 
 
-def rfc3339_to_epoch(rfc3339_string):
-    # Parse the RFC 3339 date-time string into a datetime object
-    dt = dateutil.parser.isoparse(rfc3339_string)
+def ingest_locator_sample(router_id, if_name, locator_addr, output_bytes, time_stamp):
+    # Update the moving average for a locator counter and record the rate on the router
+    good_data, moving_average = monitor.update_data(router_id, if_name, locator_addr, output_bytes, time_stamp)
+    if good_data:
+        router_dict[router_id].add_intf_locator(if_name, locator_addr, moving_average, time_stamp)
+    else:
+        # the counter was reset, drop the stale rate until the series has a new valid sample
+        router_dict[router_id].remove_intf_locator(if_name, locator_addr)
+    return good_data
 
-    # Convert the datetime object to epoch time (Unix timestamp)
-    epoch_time = int(dt.timestamp())
-    return epoch_time
+
+def update_traffic_matrix(matrix, locator_addr):
+    for router_id in router_dict.keys():
+        external_traffic = traffic_matrix_engine.get_external_traffic(router_dict, router_id, locator_addr)
+        if external_traffic >= EXTERNAL_TRAFFIC_THRESHOLD:
+            logging.info(f"Router {router_id} is the source of {external_traffic} Mbps to locator {locator_addr}.")
+            matrix.add_traffic_entry(**build_traffic_entry(router_id, locator_addr, external_traffic))
+
+
+def build_traffic_entry(router_id, locator_addr, external_traffic):
+    # Describe the demand a router sources towards a locator
+    source_router_id = topology_index.get_display_name(router_id)
+    dest_router_id = topology_index.get_display_name(get_router_id_from_locator(locator_addr))
+    algo_name = topology_index.get_sid_for_locator(locator_addr)[1]
+    demand_name = f"{source_router_id}_{dest_router_id}_{algo_name}"
+    return {
+        'source_router': source_router_id,
+        'dest_router': dest_router_id,
+        'locator_addr': locator_addr,
+        'traffic_rate': external_traffic,
+        'algo_name': algo_name,
+        'demand_name': demand_name
+    }
+
+
+def influx_time_to_epoch(influx_time):
+    # Influx returns numbers when an epoch precision is requested, RFC 3339 strings otherwise
+    if isinstance(influx_time, str):
+        return influx.rfc3339_to_epoch(influx_time)
+    return int(influx_time) // INFLUX_EPOCH_DIVISORS[INFLUX_EPOCH]
 
 
 def get_router_id_from_locator(locator_addr):
-    tmp_locator_id = locator_addr.split(':')[2]
-    for router, attributes in router_dict.items():
-        if tmp_locator_id == attributes.locator:
-            return router
-    return "unknown"
+    return topology_index.get_router_for_locator(locator_addr)
@@ -0,0 +1,95 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import ipaddress
+from types import MappingProxyType
+
+
+def get_locator_node_id(locator_addr):
+    """
+    Return the node id of an SRv6 locator, the 16 bits that follow the 32 bit locator block.
+
+    :param locator_addr: The IPv6 address of the locator, e.g. 'fcff:13:47::'.
+    :return: The node id as an integer, e.g. 0x47.
+    """
+    packed = ipaddress.IPv6Address(locator_addr).packed
+    return int.from_bytes(packed[4:6], 'big')
+
+
+class TopologyIndex:
+    def __init__(self, node_neighbors, sid_map, node_names):
+        """
+        Build the lookup tables for the topology once, from the contents of node_neighbors.json,
+        sid_map.json and node_name_lookup.json.
+
+        :param node_neighbors: Dictionary of router id to its attributes, including its 'locator' node id.
+        :param sid_map: Dictionary of locator address to [SID, algo name].
+        :param node_names: Dictionary of router id to display name.
+        """
+        # Locator node ids are written in hex in the locator address, e.g. '47' in fcff:13:47::
+        self.router_by_node_id = MappingProxyType(
+            {int(attributes['locator'], 16): router_id for router_id, attributes in node_neighbors.items()})
+        self.node_names = MappingProxyType(dict(node_names))
+        self.sid_by_locator = MappingProxyType(
+            {locator_addr: (sid, algo_name) for locator_addr, (sid, algo_name) in sid_map.items()})
+        # Resolve every known locator up front, other locators are resolved once and then cached
+        self.router_by_locator = {locator_addr: self.match_locator(locator_addr) for locator_addr in sid_map.keys()}
+
+    def match_locator(self, locator_addr):
+        """
+        Find the router that owns a locator by matching the node id that follows the locator block.
+
+        :param locator_addr: The IPv6 address of the locator.
+        :return: The router id, or "unknown" if no router owns the locator.
+        """
+        try:
+            return self.router_by_node_id.get(get_locator_node_id(locator_addr), "unknown")
+        except ValueError:
+            return "unknown"
+
+    def get_router_for_locator(self, locator_addr):
+        """
+        Get the router that owns a locator.
+
+        :param locator_addr: The IPv6 address of the locator.
+        :return: The router id, or "unknown" if no router owns the locator.
+        """
+        router_id = self.router_by_locator.get(locator_addr)
+        if router_id is None:
+            router_id = self.match_locator(locator_addr)
+            self.router_by_locator[locator_addr] = router_id
+        return router_id
+
+    def get_sid_for_locator(self, locator_addr):
+        """
+        Get the SID and FlexAlgo name of a locator.
+
+        :param locator_addr: The IPv6 address of the locator.
+        :return: A (sid, algo_name) tuple.
+        """
+        return self.sid_by_locator[locator_addr]
+
+    def get_display_name(self, router_id):
+        """
+        Get the display name of a router.
+
+        :param router_id: The host name of the router.
+        :return: The display name, or the host name if the router has no display name.
+        """
+        return self.node_names.get(router_id, router_id)
@@ -16,13 +16,47 @@ IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
 or implied.
 
 """
+import heapq
+import threading
+from python import errors
+
+# Entry fields the matrix can be filtered on, each has a secondary index
+INDEXED_FIELDS = ('source_router', 'dest_router', 'algo_name', 'locator_addr')
+
 
 class TrafficMatrix:
     def __init__(self):
         """
-        Initialize the TrafficMatrix instance with an empty list of traffic entries.
+        Initialize the TrafficMatrix instance with no traffic entries.
         """
-        self.traffic_entries = []
+        # The entries keyed by (source_router, locator_addr), in insertion order so removing one is O(1)
+        self.entry_index = {}
+        # Secondary indexes, field -> field value -> {(source_router, locator_addr): entry}
+        self.field_index = {field: {} for field in INDEXED_FIELDS}
+        # Traffic totals, field -> field value -> [traffic rate, number of entries]
+        self.totals = {field: {} for field in ('source_router', 'dest_router', 'algo_name')}
+        # The entries by descending traffic rate, built by the first unfiltered top query after a change
+        self.rate_order = None
+        # Queries may come from other threads than the one updating the matrix
+        self.lock = threading.RLock()
+
+    def index_entry(self, entry, sign):
+        # Add (sign 1) or remove (sign -1) an entry from the secondary indexes and totals
+        key = (entry['source_router'], entry['locator_addr'])
+        for field, index in self.field_index.items():
+            if sign > 0:
+                index.setdefault(entry[field], {})[key] = entry
+            else:
+                entries = index[entry[field]]
+                del entries[key]
+                if not entries:
+                    del index[entry[field]]
+        for field, totals in self.totals.items():
+            total = totals.setdefault(entry[field], [0, 0])
+            total[0] += sign * entry['traffic_rate']
+            total[1] += sign
+            if total[1] == 0:
+                del totals[entry[field]]
 
     def add_traffic_entry(self, source_router, dest_router, locator_addr, traffic_rate, algo_name, demand_name):
         """
@@ -35,10 +69,9 @@ class TrafficMatrix:
         :param locator_addr: The address of the locator.
         :param traffic_rate: The traffic rate in Gbps (as an integer)
         """
-        for entry in self.traffic_entries:
-            if entry['source_router'] == source_router and entry['locator_addr'] == locator_addr:
-                entry['traffic_rate'] = traffic_rate
-                return
+        if (source_router, locator_addr) in self.entry_index:
+            self.set_traffic_rate(source_router, locator_addr, traffic_rate)
+            return
 
         # If no existing entry is found, add a new one
         new_entry = {
@@ -49,7 +82,53 @@ class TrafficMatrix:
             'algo_name': algo_name,
             'demand_name': demand_name
         }
-        self.traffic_entries.append(new_entry)
+        with self.lock:
+            self.entry_index[(source_router, locator_addr)] = new_entry
+            self.index_entry(new_entry, 1)
+            self.rate_order = None
+
+    def set_traffic_rate(self, source_router, locator_addr, traffic_rate):
+        """
+        Update the traffic rate of an existing traffic entry.
+
+        :param source_router: The identifier of the source router.
+        :param locator_addr: The address of the locator.
+        :param traffic_rate: The new traffic rate.
+        """
+        with self.lock:
+            entry = self.entry_index[(source_router, locator_addr)]
+            change = traffic_rate - entry['traffic_rate']
+            if change == 0:
+                return
+            entry['traffic_rate'] = traffic_rate
+            for field, totals in self.totals.items():
+                totals[entry[field]][0] += change
+            self.rate_order = None
+
+    def get_traffic_entry(self, source_router, locator_addr):
+        """
+        Retrieve the traffic entry for a source router and locator address.
+
+        :param source_router: The identifier of the source router.
+        :param locator_addr: The address of the locator.
+        :return: The traffic entry, or None if there is no such entry.
+        """
+        return self.entry_index.get((source_router, locator_addr))
+
+    def remove_traffic_entry(self, source_router, locator_addr):
+        """
+        Remove the traffic entry for a source router and locator address.
+
+        :param source_router: The identifier of the source router.
+        :param locator_addr: The address of the locator.
+        :return: The removed traffic entry, or None if there was no such entry.
+        """
+        with self.lock:
+            entry = self.entry_index.pop((source_router, locator_addr), None)
+            if entry is not None:
+                self.index_entry(entry, -1)
+                self.rate_order = None
+        return entry
 
     def get_traffic_for_router(self, source_router):
         """
@@ -58,7 +137,8 @@ class TrafficMatrix:
         :param source_router: The identifier of the source router.
         :return: A list of traffic entries for the specified router.
         """
-        return [entry for entry in self.traffic_entries if entry['source_router'] == source_router]
+        with self.lock:
+            return list(self.field_index['source_router'].get(source_router, {}).values())
 
     def get_total_traffic(self):
         """
@@ -66,14 +146,66 @@ class TrafficMatrix:
 
         :return: The total traffic rate in Gbps as an integer.
         """
-        return sum(entry['traffic_rate'] for entry in self.traffic_entries)
+        with self.lock:
+            return sum(total[0] for total in self.totals['algo_name'].values())
+
+    def query(self, source_router=None, dest_router=None, algo_name=None, locator_addr=None, top=None):
+        """
+        Find the traffic entries matching all of the given fields, using the secondary index of the
+        most selective field. Filtered queries cost O(m), or O(m log top) with top, where m is the number of
+        entries of the most selective field value. Unfiltered top queries slice the rate order in O(top),
+        the first one after the matrix changed sorts all entries in O(n log n).
+
+        :param source_router: Only entries from this source router.
+        :param dest_router: Only entries to this destination router.
+        :param algo_name: Only entries of this FlexAlgo.
+        :param locator_addr: Only entries to this locator.
+        :param top: Only the top entries by traffic rate, all matching entries in insertion order if None.
+        :return: A list of copies of the matching traffic entries.
+        """
+        if top is not None and (not isinstance(top, int) or top < 1):
+            raise errors.InputError("top", "The number of top entries must be a positive integer.")
+        filters = {field: value for field, value in zip(INDEXED_FIELDS,
+                                                        (source_router, dest_router, algo_name, locator_addr))
+                   if value is not None}
+        with self.lock:
+            if filters:
+                candidates = min((self.field_index[field].get(value, {}) for field, value in filters.items()), key=len)
+                entries = [entry for entry in candidates.values()
+                           if all(entry[field] == value for field, value in filters.items())]
+                if top is not None:
+                    entries = heapq.nlargest(top, entries, key=lambda entry: entry['traffic_rate'])
+            elif top is not None:
+                if self.rate_order is None:
+                    self.rate_order = sorted(self.entry_index.values(), key=lambda entry: entry['traffic_rate'],
+                                             reverse=True)
+                entries = self.rate_order[:top]
+            else:
+                entries = self.entry_index.values()
+            return [entry.copy() for entry in entries]
+
+    def get_aggregates(self):
+        """
+        Get the traffic totals per FlexAlgo, per source router and per destination router.
+
+        :return: Dictionary of 'algo', 'source' and 'destination' totals, each a dictionary of field
+                 value to {'traffic_rate': total rate, 'demands': number of entries}, and the overall 'total'.
+        """
+        with self.lock:
+            aggregates = {name: {value: {'traffic_rate': total[0], 'demands': total[1]}
+                                 for value, total in self.totals[field].items()}
+                          for name, field in (('algo', 'algo_name'), ('source', 'source_router'),
+                                              ('destination', 'dest_router'))}
+            aggregates['total'] = sum(total[0] for total in self.totals['algo_name'].values())
+        return aggregates
 
     def get_traffic_entries(self):
-        # Return the traffic_entries list
-        return self.traffic_entries
+        # Return a list of the traffic entries in insertion order
+        with self.lock:
+            return list(self.entry_index.values())
 
     def __repr__(self):
         """
         Return a string representation of the TrafficMatrix instance.
         """
-        return f"TrafficMatrix(traffic_entries={self.traffic_entries})"
\ No newline at end of file
+        return f"TrafficMatrix(traffic_entries={self.get_traffic_entries()})"
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+
+Copyright (c) 2025 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+
+"""
+
+import logging
+import numpy as np
+from python import traffic_matrix
+
+
+def get_external_traffic(router_dict, router_id, locator_addr):
+    """
+    Compute the traffic a router sources towards a locator, i.e. the rate it sends to the locator
+    minus the rate its neighbors send to it for the same locator.
+
+    :param router_dict: The router inventory keyed by router id.
+    :param router_id: The router to compute the external traffic for.
+    :param locator_addr: The address of the locator.
+    :return: The external traffic rate, 0 if the router sends nothing to the locator.
+    """
+    router = router_dict[router_id]
+    router_total = router.sum_locators_for_address(locator_addr)
+    if router_total <= 0:
+        return 0
+    neighbors_total = 0
+    # find all neighbors with locator and get traffic rate
+    for neighbor in router.neighbors:
+        neighbors_total += router_dict[neighbor['neighbor_id']].get_intf_locator(neighbor['remote_intf_name'],
+                                                                                 locator_addr)[0]
+    return router_total - neighbors_total
+
+
+class IncrementalTrafficMatrixEngine:
+    def __init__(self, router_dict, build_traffic_entry, threshold):
+        """
+        Initialize an engine that keeps a traffic matrix up to date by recomputing only the rows
+        affected by changed locator rates.
+
+        :param router_dict: The router inventory keyed by router id.
+        :param build_traffic_entry: Function of (router_id, locator_addr, traffic_rate) returning the
+                                    keyword arguments for TrafficMatrix.add_traffic_entry.
+        :param threshold: The minimum external traffic rate for a demand to be part of the matrix.
+        """
+        self.router_dict = router_dict
+        self.build_traffic_entry = build_traffic_entry
+        self.threshold = threshold
+        self.traffic_matrix = traffic_matrix.TrafficMatrix()
+        # (router_id, locator_addr) -> (source_router, locator_addr) key of the entry in the traffic matrix
+        self.rows = {}
+        # The external traffic of a router depends on the rates of its neighbors, so a rate change on
+        # a router affects the rows of every router that lists it as a neighbor
+        self.upstream_routers = {router_id: set() for router_id in router_dict.keys()}
+        for router_id, router in router_dict.items():
+            for neighbor in router.neighbors:
+                self.upstream_routers.setdefault(neighbor['neighbor_id'], set()).add(router_id)
+
+    def get_affected_rows(self):
+        """
+        Collect the (router_id, locator_addr) rows affected by the rate changes since the last computation.
+
+        :return: A set of (router_id, locator_addr) tuples.
+        """
+        affected_rows = set()
+        for router_id, router in self.router_dict.items():
+            for locator_addr in router.pop_changed_locators():
+                affected_rows.add((router_id, locator_addr))
+                for upstream_router_id in self.upstream_routers.get(router_id, ()):
+                    affected_rows.add((upstream_router_id, locator_addr))
+        return affected_rows
+
+    def compute(self):
+        """
+        Recompute the affected rows of the traffic matrix.
+
+        :return: A change set dictionary with the 'added', 'updated' and 'removed' traffic entries.
+        """
+        changes = {'added': [], 'updated': [], 'removed': []}
+        for router_id, locator_addr in self.get_affected_rows():
+            external_traffic = get_external_traffic(self.router_dict, router_id, locator_addr)
+            row_key = self.rows.get((router_id, locator_addr))
+            if external_traffic >= self.threshold:
+                if row_key is None:
+                    entry_args = self.build_traffic_entry(router_id, locator_addr, external_traffic)
+                    self.traffic_matrix.add_traffic_entry(**entry_args)
+                    row_key = (entry_args['source_router'], locator_addr)
+                    self.rows[(router_id, locator_addr)] = row_key
+                    changes['added'].append(self.traffic_matrix.get_traffic_entry(*row_key))
+                    logging.info(
+                        f"Router {router_id} is the source of {external_traffic} Mbps to locator {locator_addr}.")
+                else:
+                    entry = self.traffic_matrix.get_traffic_entry(*row_key)
+                    if entry['traffic_rate'] != external_traffic:
+                        self.traffic_matrix.set_traffic_rate(*row_key, external_traffic)
+                        changes['updated'].append(entry)
+            elif row_key is not None:
+                del self.rows[(router_id, locator_addr)]
+                changes['removed'].append(self.traffic_matrix.remove_traffic_entry(*row_key))
+        return changes
+
+
+class VectorizedTrafficMatrixEngine:
+    def __init__(self, router_dict, build_traffic_entry, threshold):
+        """
+        Initialize an engine that computes the traffic matrix with array operations over integer
+        router, interface and locator ids.
+
+        :param router_dict: The router inventory keyed by router id.
+        :param build_traffic_entry: Function of (router_id, locator_addr, traffic_rate) returning the
+                                    keyword arguments for TrafficMatrix.add_traffic_entry.
+        :param threshold: The minimum external traffic rate for a demand to be part of the matrix.
+        """
+        self.router_dict = router_dict
+        self.build_traffic_entry = build_traffic_entry
+        self.threshold = threshold
+        self.router_ids = list(router_dict.keys())
+        self.router_index = {router_id: index for index, router_id in enumerate(self.router_ids)}
+        # (router index, interface name) -> interface id, and the router index of every interface id
+        self.intf_index = {}
+        self.intf_router = []
+        # Neighbor adjacency as index arrays, one element per neighbor entry: the router the entry
+        # belongs to and the id of the remote interface on the neighbor
+        neighbor_src = []
+        neighbor_intf = []
+        for router_id, router in router_dict.items():
+            for neighbor in router.neighbors:
+                if neighbor['neighbor_id'] not in self.router_index:
+                    continue
+                neighbor_src.append(self.router_index[router_id])
+                neighbor_intf.append(self.get_intf_id(self.router_index[neighbor['neighbor_id']],
+                                                      neighbor['remote_intf_name']))
+        self.neighbor_src = np.array(neighbor_src, dtype=np.int64)
+        self.neighbor_intf = np.array(neighbor_intf, dtype=np.int64)
+        # The adjacency interfaces are registered first, so they hold the ids below this count
+        self.adjacency_intf_count = len(self.intf_router)
+
+    def get_intf_id(self, router_index, intf_name):
+        """
+        Return the integer id of a router interface, registering it if it is new.
+
+        :param router_index: The integer index of the router.
+        :param intf_name: The name of the interface.
+        :return: The interface id.
+        """
+        intf_id = self.intf_index.get((router_index, intf_name))
+        if intf_id is None:
+            intf_id = len(self.intf_router)
+            self.intf_index[(router_index, intf_name)] = intf_id
+            self.intf_router.append(router_index)
+        return intf_id
+
+    def compute(self, locator_addrs):
+        """
+        Compute the traffic matrix for a list of locator addresses.
+
+        :param locator_addrs: The locator addresses to include in the matrix.
+        :return: A new TrafficMatrix with entries in the same order as the per-locator computation.
+        """
+        locator_index = {locator_addr: index for index, locator_addr in enumerate(locator_addrs)}
+        # Gather the per-interface locator rates as (interface id, locator id, rate) arrays
+        entry_intf = []
+        entry_locator = []
+        entry_rate = []
+        for router_index, router_id in enumerate(self.router_ids):
+            for intf_name, locators in self.router_dict[router_id].locator_intf.items():
+                intf_id = self.get_intf_id(router_index, intf_name)
+                for locator_addr, locator_data in locators.items():
+                    if locator_addr in locator_index:
+                        entry_intf.append(intf_id)
+                        entry_locator.append(locator_index[locator_addr])
+                        entry_rate.append(locator_data['rate'])
+        entry_intf = np.array(entry_intf, dtype=np.int64)
+        entry_locator = np.array(entry_locator, dtype=np.int64)
+        entry_rate = np.array(entry_rate, dtype=np.int64)
+        intf_router = np.array(self.intf_router, dtype=np.int64)
+
+        # Total rate per router and locator over all of the router's interfaces
+        router_total = np.zeros((len(self.router_ids), len(locator_addrs)), dtype=np.int64)
+        np.add.at(router_total, (intf_router[entry_intf], entry_locator), entry_rate)
+
+        # Rates on the adjacency interfaces, then summed into the router each neighbor entry belongs to
+        adjacency_rates = np.zeros((self.adjacency_intf_count, len(locator_addrs)), dtype=np.int64)
+        on_adjacency = entry_intf < self.adjacency_intf_count
+        adjacency_rates[entry_intf[on_adjacency], entry_locator[on_adjacency]] = entry_rate[on_adjacency]
+        neighbors_total = np.zeros_like(router_total)
+        np.add.at(neighbors_total, self.neighbor_src, adjacency_rates[self.neighbor_intf])
+
+        external_traffic = router_total - neighbors_total
+        sources = (router_total > 0) & (external_traffic >= self.threshold)
+
+        # Emit the entries locator by locator, router by router, like the per-locator computation
+        local_traffic_matrix = traffic_matrix.TrafficMatrix()
+        for locator_id, router_index in np.argwhere(sources.T):
+            router_id = self.router_ids[router_index]
+            locator_addr = locator_addrs[locator_id]
+            rate = int(external_traffic[router_index, locator_id])
+            logging.info(f"Router {router_id} is the source of {rate} Mbps to locator {locator_addr}.")
+            local_traffic_matrix.add_traffic_entry(**self.build_traffic_entry(router_id, locator_addr, rate))
+        return local_traffic_matrix
@@ -26,7 +26,7 @@ from urllib.parse import urlencode
 http_client = httpclient.AsyncHTTPClient()
 
 
-async def rest_get_tornado_httpclient(url, user=None, password=None, data=None):
+async def rest_get_tornado_httpclient(url, user=None, password=None, data=None, request_timeout=None):
     """ Perform an async GET request with Tornado's HTTPClient. """
     response = None
     # Encode params if provided
@@ -38,6 +38,7 @@ async def rest_get_tornado_httpclient(url, user=None, password=None, data=None):
         url=url,
         auth_username=user,
         auth_password=password,
+        request_timeout=request_timeout,
         headers=httputil.HTTPHeaders({
             "content-type": "application/json",
             "accept": "application/json"
@@ -55,22 +56,58 @@ async def rest_get_tornado_httpclient(url, user=None, password=None, data=None):
         del response  # Ensure request is deleted
 
 
-async def rest_post_tornado_httpclient(url, user=None, password=None, data=None):
-    """ Perform an async POST request with Tornado's HTTPClient. """
+async def rest_get_tornado_httpclient_stream(url, streaming_callback, user=None, password=None, data=None,
+                                             request_timeout=None):
+    """ Perform an async GET request with Tornado's HTTPClient, passing the body to streaming_callback
+    chunk by chunk as it arrives instead of buffering it. Returns None on success. """
     response = None
+    # Encode params if provided
+    if data:
+        query_string = urlencode(data)
+        url = f"{url}?{query_string}"
 
     http_request = httpclient.HTTPRequest(
         url=url,
-        method="POST",
-        body=data,
         auth_username=user,
         auth_password=password,
+        request_timeout=request_timeout,
+        streaming_callback=streaming_callback,
         headers=httputil.HTTPHeaders({
             "content-type": "application/json",
             "accept": "application/json"
         })
     )
 
+    try:
+        response = await http_client.fetch(http_request)
+        return None if response.code == 200 else f"Failed HTTP response...code: {response.code}"
+    except Exception as err:
+        logging.error(f"Error: {err}")
+        return f"Error: {err}"
+    finally:
+        del response  # Ensure request is deleted
+
+
+async def rest_post_tornado_httpclient(url, user=None, password=None, data=None, headers=None, request_timeout=None):
+    """ Perform an async POST request with Tornado's HTTPClient. """
+    response = None
+    request_headers = httputil.HTTPHeaders({
+        "content-type": "application/json",
+        "accept": "application/json"
+    })
+    if headers:
+        request_headers.update(headers)
+
+    http_request = httpclient.HTTPRequest(
+        url=url,
+        method="POST",
+        body=data,
+        auth_username=user,
+        auth_password=password,
+        request_timeout=request_timeout,
+        headers=request_headers
+    )
+
     try:
         response = await http_client.fetch(http_request)
         return response.body.decode('utf-8') if response.code in [200, 201,
@@ -20,7 +20,6 @@ import argparse
 from datetime import datetime
 import json
 import os
-import traceback
 import threading
 from logging import Logger
 import tornado.web
@@ -29,7 +28,7 @@ import tornado.escape
 import tornado.ioloop
 import tornado.locks
 from tornado.web import url
-from python import methods, telemetry
+from python import methods, telemetry, locator_stream, broadcast, errors
 import logging
 from distutils.dir_util import remove_tree
 from distutils.dir_util import mkpath
@@ -41,8 +40,8 @@ import socket
 # global variables...
 logging_level = 'INFO'
 initial_url = "https://jsonplaceholder.typicode.com/posts"
-# open_websockets = []
-open_websockets = set()  # Use a set instead of a list to prevent duplicates
+# Owns the open websockets, messages from the telemetry thread are handed to it
+broadcast_hub = broadcast.BroadcastHub()
 # application = tornado.web.Application
 KAFKA_TOPIC = 'telegraf'
 KAFKA_BOOTSTRAP_SERVER = '10.135.7.105:9092'
@@ -61,6 +60,46 @@ class InterfaceHandler(tornado.web.RequestHandler):
         await self.render("templates/interfaces.html", port=args.port)
 
 
+class SnapshotHandler(tornado.web.RequestHandler):
+    """Serves the latest traffic matrix or interface data from memory, with ETag revalidation."""
+
+    def initialize(self):
+        self.snapshot = None
+
+    async def get(self, name):
+        self.snapshot = telemetry.snapshots.get(name)
+        if self.snapshot is None:
+            raise tornado.web.HTTPError(404)
+        self.set_header("Content-Type", "application/json")
+        # Browsers may keep the response but must revalidate it, unchanged data is answered with a 304
+        self.set_header("Cache-Control", "no-cache")
+        self.write(self.snapshot.body)
+
+    def compute_etag(self):
+        # The ETag is computed once when the snapshot is stored, not for every response
+        return self.snapshot.etag if self.snapshot is not None else None
+
+
+class TrafficQueryHandler(tornado.web.RequestHandler):
+    """Answers queries against the current traffic matrix, e.g. /api/traffic_matrix/query?algo_name=MAIN&top=10."""
+
+    async def get(self, query):
+        if query == 'aggregates':
+            result = methods.get_traffic_aggregates()
+        else:
+            top = self.get_argument('top', None)
+            try:
+                result = methods.query_traffic_matrix(source_router=self.get_argument('source_router', None),
+                                                      dest_router=self.get_argument('dest_router', None),
+                                                      algo_name=self.get_argument('algo_name', None),
+                                                      locator_addr=self.get_argument('locator_addr', None),
+                                                      top=int(top) if top is not None and top.isdigit() else top)
+            except errors.InputError as err:
+                raise tornado.web.HTTPError(400, err.message)
+        self.set_header("Content-Type", "application/json")
+        self.write(json.dumps(result, separators=(",", ":")))
+
+
 class AjaxHandler(tornado.web.RequestHandler):
     async def post(self):
         global initial_url
@@ -97,7 +136,9 @@ class WebSocket(tornado.websocket.WebSocketHandler):
 
     def open(self):
         logging.info("WebSocket opened")
-        open_websockets.add(self)  # Add WebSocket instance to the set
+        # Start the client from the latest snapshots, the deltas broadcast afterwards apply on top of them
+        broadcast_hub.register(self, [telemetry.traffic_channel.snapshot_json,
+                                      telemetry.interface_channel.snapshot_json])
 
     def send_message(self, message):
         if self.ws_connection and self.ws_connection.stream and not self.ws_connection.stream.closed():
@@ -107,24 +148,14 @@ class WebSocket(tornado.websocket.WebSocketHandler):
 
     def on_message(self, message):
         """Evaluates the function pointed to by json-rpc."""
-        json_rpc = json.loads(message)
-        logging.info("WebSocket received message: " + json.dumps(json_rpc))
-
-        try:
-            result = getattr(methods, json_rpc["method"])(**json_rpc["params"])
-            error = None
-        except Exception as err:
-            result = traceback.format_exc()
-            error = 1
+        # Calls run concurrently, each reply is sent when its call completes
+        tornado.ioloop.IOLoop.current().spawn_callback(self.reply_rpc, message)
 
-        json_rpc_response = json.dumps({"response": result, "error": error}, separators=(",", ":"))
-        logging.info("WebSocket replied with message: " + json_rpc_response)
-
-        self.send_message(json_rpc_response)  # Use the safer send_message method
+    async def reply_rpc(self, message):
+        self.send_message(await methods.rpc_methods.dispatch(message))
 
     def on_close(self):
-        if self in open_websockets:
-            open_websockets.remove(self)  # Ensure the WebSocket is removed properly
+        broadcast_hub.unregister(self)
         self.close()
         logging.info("WebSocket closed!")
 
@@ -171,7 +202,9 @@ def main():
                     dict(path=settings['static_path'])),
                 url(r'/interfaces', InterfaceHandler, name="interfaces"),
                 # url(r'/references', ReferencesHandler, name="references"),
-                url(r'/ajax', AjaxHandler, name="ajax")
+                url(r'/ajax', AjaxHandler, name="ajax"),
+                url(r'/api/(traffic_matrix|interface_data)', SnapshotHandler, name="snapshot"),
+                url(r'/api/traffic_matrix/(query|aggregates)', TrafficQueryHandler, name="traffic_query")
                 ]
 
     application = tornado.web.Application(handlers)
@@ -190,6 +223,8 @@ def main():
 
     # webbrowser.open("http://localhost:%d/" % args.port, new=2)
 
+    broadcast_hub.set_io_loop(tornado.ioloop.IOLoop.current())
+
     signal.signal(signal.SIGTERM, signal_handler)
     try:
         # Start the thread for the telemetry processing
@@ -226,9 +261,16 @@ def run_traffic_matrix_in_thread():
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
+    # Select where the locator counters come from, polling influx is the default
+    stream_source = None
+    if args.ingest == 'kafka':
+        stream_source = locator_stream.kafka_source(KAFKA_TOPIC, KAFKA_BOOTSTRAP_SERVER)
+    elif args.ingest == 'replay':
+        stream_source = locator_stream.replay_source(args.replay_source, args.replay_speed)
+
     try:
         while not stop_event.is_set():  # Check stop event before running
-            loop.run_until_complete(telemetry.traffic_matrix_updater(open_websockets))
+            loop.run_until_complete(telemetry.traffic_matrix_updater(broadcast_hub, stream_source))
             # asyncio.sleep(1)  # Prevent 100% CPU usage
     except asyncio.CancelledError:
         logging.info("Telemetry thread stopped.")
@@ -239,8 +281,7 @@ def run_traffic_matrix_in_thread():
 
 
 def send_message_open_ws(message):
-    for ws in open_websockets:
-        ws.send_message(message)
+    broadcast_hub.broadcast(message)
 
 
 def clean_files():
@@ -261,5 +302,12 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Starts a webserver for stuff.")
     parser.add_argument("--port", type=int, default=8000, help="The port on which "
                                                                "to serve the website.")
+    parser.add_argument("--ingest", choices=['influx', 'kafka', 'replay'], default='influx',
+                        help="Where to collect the SRv6 locator counters from.")
+    parser.add_argument("--replay-source", help="File path or host:port to replay telegraf records from.")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed for file sources, "
+                                                                        "0 replays as fast as possible.")
     args = parser.parse_args()
+    if args.ingest == 'replay' and not args.replay_source:
+        parser.error("--replay-source is required with --ingest replay")
     main()